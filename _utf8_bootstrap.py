@@ -0,0 +1,21 @@
+"""
+UTF-8 console setup shared by the pipeline scripts.
+Call configure_utf8() once at the top of a script: it switches its Windows console streams to UTF-8 and
+puts the interpreter's UTF-8 mode in the environment, so every python child it starts inherits it.
+"""
+
+import os
+import sys
+
+def configure_utf8():
+    """Make this process's console and every python child it starts use UTF-8."""
+    # Children started via subprocess inherit this; no per-call env copy or encoding kwargs needed
+    os.environ.setdefault("PYTHONUTF8", "1")
+
+    if sys.platform == "win32":
+        try:
+            if hasattr(sys.stdout, 'reconfigure'):
+                sys.stdout.reconfigure(encoding='utf-8')
+                sys.stderr.reconfigure(encoding='utf-8')
+        except:
+            pass
@@ -10,6 +10,7 @@ import subprocess
 from pathlib import Path
 import json
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # === CONFIGURATION ===
 DANCERS_CONTENT_BASE = Path(r"H:\dancers_content")
@@ -22,6 +23,7 @@ TARGET_WIDTH = 1080
 TARGET_HEIGHT = 1920  # 9:16 aspect ratio
 TARGET_BITRATE = "8M"
 TARGET_FPS = 30
+MAX_CONCURRENT_CROPS = 3  # ffmpeg encodes (and their output writes) kept in flight at once
 
 def find_latest_run_folder():
     """Find the most recent Run_ folder."""
@@ -115,6 +117,7 @@ def main():
     successful_conversions = 0
     failed_conversions = 0
     
+    jobs = []
     for video_path in upscaled_videos:
         # Generate output filename
         output_filename = f"reel_{video_path.stem}.mp4"
@@ -125,11 +128,15 @@ def main():
             print(f"⏭️ SKIP: {output_filename} already exists")
             continue
         
-        # Convert video
-        if crop_video_to_reels(video_path, output_path):
-            successful_conversions += 1
-        else:
-            failed_conversions += 1
+        jobs.append((video_path, output_path))
+    
+    # Convert videos, several ffmpeg processes at a time
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_CROPS) as executor:
+        for success in executor.map(lambda job: crop_video_to_reels(*job), jobs):
+            if success:
+                successful_conversions += 1
+            else:
+                failed_conversions += 1
     
     # Step 5: Summary
     print("\n" + "=" * 60)
@@ -0,0 +1,32 @@
+"""
+Process-wide cache of the parsed .env file.
+Scripts that import each other share one parse instead of calling load_dotenv() per module.
+"""
+
+import os
+from functools import lru_cache
+from dotenv import dotenv_values, find_dotenv
+
+@lru_cache(maxsize=1)
+def _dotenv_path():
+    return find_dotenv()
+
+@lru_cache(maxsize=4)
+def _parse(path, mtime):
+    # mtime is part of the cache key so edits are picked up by long-running processes
+    return dotenv_values(path)
+
+def load():
+    """Return the parsed .env mapping, re-parsing only when the file changes."""
+    path = _dotenv_path()
+    if not path:
+        return {}
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+    return _parse(path, mtime)
+
+def get(name, default=None):
+    """Look up a variable; real environment variables win over .env, like load_dotenv()."""
+    return os.environ.get(name) or load().get(name) or default
@@ -0,0 +1,61 @@
+"""
+Shared HTTP helpers for the Graph API scripts.
+Sessions created here keep connections alive and decode JSON with orjson when it is installed.
+"""
+
+import json
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def loads(data):
+    """Decode JSON text/bytes, preferring orjson."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps_line(obj):
+    """Encode obj as one compact JSON line (bytes, newline-terminated), preferring orjson."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, separators=(',', ':')) + '\n').encode()
+
+def dumps_pretty(obj):
+    """Encode obj as indented JSON bytes (2 spaces), preferring orjson."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode()
+
+class FastJSONResponse(requests.Response):
+    """Response whose .json() parses the raw bytes with orjson."""
+
+    def json(self, **kwargs):
+        if kwargs:
+            return super().json(**kwargs)
+        try:
+            return orjson.loads(self.content)
+        except orjson.JSONDecodeError as e:
+            raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos)
+
+class FastJSONSession(requests.Session):
+    """requests.Session that hands back FastJSONResponse objects when orjson is available."""
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if orjson is not None:
+            response.__class__ = FastJSONResponse
+        return response
+
+def create_session(prefix="https://", retries=0, pool_connections=10, pool_maxsize=10):
+    """Build a FastJSONSession with a pooled adapter mounted on prefix."""
+    session = FastJSONSession()
+    session.mount(prefix, HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retries
+    ))
+    return session
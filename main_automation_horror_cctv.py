@@ -18,6 +18,7 @@ import os
 import sys
 import json
 import random
+import re
 import requests
 import shutil
 import subprocess
@@ -51,14 +52,8 @@ except ImportError:
 load_dotenv()  # Looking for TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID
 
 # === UNICODE FIX FOR HORROR CCTV AUTOMATION ===
-if sys.platform == "win32":
-    os.environ["PYTHONIOENCODING"] = "utf-8"
-    try:
-        if hasattr(sys.stdout, 'reconfigure'):
-            sys.stdout.reconfigure(encoding='utf-8')
-            sys.stderr.reconfigure(encoding='utf-8')
-    except:
-        pass
+from _utf8_bootstrap import configure_utf8
+configure_utf8()
 
 print("DEBUG: Horror CCTV Automation Script execution started.")
 
@@ -99,19 +94,19 @@ TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
     print("WARNING: TELEGRAM_BOT_TOKEN or TELEGRAM_CHAT_ID not set in .env. Telegram approval will fail if chosen.")
 
+EMOJI_REPLACEMENTS = {
+    '🎬': '[MOVIE]', '🔤': '[TEXT]', '🟢': '[GREEN]', '📝': '[MEMO]',
+    '✅': '[OK]', '❌': '[ERROR]', '⚠️': '[WARN]', '🧹': '[CLEAN]',
+    '⏹️': '[STOP]', '🔥': '[FIRE]', '🚀': '[ROCKET]', '📊': '[CHART]',
+    '🛑': '[STOP_SIGN]', '💪': '[MUSCLE]', '🏋️': '[WEIGHT]', '📋': '[CLIPBOARD]'
+}
+# One regex pass per message instead of a str.replace per emoji (longest first so multi-codepoint emoji win)
+EMOJI_PATTERN = re.compile("|".join(map(re.escape, sorted(EMOJI_REPLACEMENTS, key=len, reverse=True))))
+
 def safe_log_message(message):
     """Sanitize Unicode characters for safe logging and printing."""
     if isinstance(message, str):
-        replacements = {
-            '🎬': '[MOVIE]', '🔤': '[TEXT]', '🟢': '[GREEN]', '📝': '[MEMO]',
-            '✅': '[OK]', '❌': '[ERROR]', '⚠️': '[WARN]', '🧹': '[CLEAN]',
-            '⏹️': '[STOP]', '🔥': '[FIRE]', '🚀': '[ROCKET]', '📊': '[CHART]',
-            '🛑': '[STOP_SIGN]', '💪': '[MUSCLE]', '🏋️': '[WEIGHT]', '📋': '[CLIPBOARD]'
-        }
-        safe_message = message
-        for unicode_char, replacement in replacements.items():
-            safe_message = safe_message.replace(unicode_char, replacement)
-        return safe_message
+        return EMOJI_PATTERN.sub(lambda m: EMOJI_REPLACEMENTS[m.group(0)], message)
     return str(message)
 
 print(f"DEBUG: Script directory: {SCRIPT_DIR}")
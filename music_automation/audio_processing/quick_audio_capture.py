@@ -1,24 +1,43 @@
 # Save as quick_audio_capture.py
 from selenium import webdriver
 import time
-import pickle
+import json
 import os
 
+COOKIES_FILE = "instagram_cookies.json"
+LEGACY_COOKIES_FILE = "instagram_cookies.pkl"
+
+def load_cookies():
+    """Read the saved cookie list, converting the old pickle file to JSON the first time."""
+    if os.path.exists(COOKIES_FILE):
+        with open(COOKIES_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    if os.path.exists(LEGACY_COOKIES_FILE):
+        import pickle
+        with open(LEGACY_COOKIES_FILE, 'rb') as f:
+            cookies = pickle.load(f)
+        with open(COOKIES_FILE, 'w', encoding='utf-8') as f:
+            json.dump(cookies, f)
+        return cookies
+    return None
+
+def to_cdp_cookie(cookie):
+    """Map a Selenium cookie dict onto CDP's CookieParam fields."""
+    cdp_cookie = {key: cookie[key] for key in ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite") if key in cookie}
+    if "expiry" in cookie:
+        cdp_cookie["expires"] = cookie["expiry"]
+    return cdp_cookie
+
 driver = webdriver.Chrome()
 
 # Load cookies
-if os.path.exists("instagram_cookies.pkl"):
-    driver.get("https://www.instagram.com")
-    time.sleep(3)
-    with open("instagram_cookies.pkl", 'rb') as f:
-        cookies = pickle.load(f)
-    for cookie in cookies:
-        try:
-            driver.add_cookie(cookie)
-        except:
-            pass
-    driver.refresh()
-    time.sleep(3)
+cookies = load_cookies()
+if cookies:
+    # One DevTools call for the whole jar; unlike add_cookie it doesn't need an instagram.com page loaded first
+    try:
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": [to_cdp_cookie(c) for c in cookies]})
+    except Exception as e:
+        print(f"⚠️ Could not restore cookies: {e}")
 
 print("📖 Opening saved audio page...")
 driver.get("https://www.instagram.com/bold.pooja/saved/audio/")
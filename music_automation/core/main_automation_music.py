@@ -65,6 +65,7 @@ print("DEBUG: Music Pipeline execution started.")
 # --- Constants ---
 MAX_API_RETRIES = 3
 API_RETRY_DELAY = 5
+API_STARTUP_TIMEOUT = 30  # Max seconds to wait for the music API server to answer
 REQUEST_TIMEOUT = 60
 POLLING_INTERVAL = 10
 POLLING_TIMEOUT_IMAGE = 600  # 10 minutes timeout for no activity
@@ -305,14 +306,16 @@ def start_api_server(config):
         logger.info(f"LOG: API server stdout: {api_stdout_log}")
         logger.info(f"LOG: API server stderr: {api_stderr_log}")
         
-        # Wait a moment for server to start
-        time.sleep(8)
-        
-        # Test if server is running (with longer wait time)
-        max_retries = 6  # 30 seconds total
-        for retry in range(max_retries):
+        # Probe until the server answers instead of sleeping a fixed delay first
+        deadline = time.monotonic() + API_STARTUP_TIMEOUT
+        delay = 0.1
+        last_error = None
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                logger.error(f"ERROR: API Server process has exited with code: {process.returncode}")
+                return None
             try:
-                response = requests.get(f"{config['api_server_url']}/", timeout=10)
+                response = requests.get(f"{config['api_server_url']}/", timeout=2)
                 if response.status_code == 200:
                     logger.info("SUCCESS: Music API Server started successfully")
                     # Test the configuration endpoint too
@@ -324,22 +327,17 @@ def start_api_server(config):
                     except:
                         pass  # Optional check
                     return process
-                else:
-                    logger.warning(f"WARNING: API Server returned status: {response.status_code}, retrying...")
+                last_error = f"status {response.status_code}"
             except requests.RequestException as e:
-                logger.warning(f"WARNING: Retry {retry+1}/{max_retries}: {e}")
-                if retry == max_retries - 1:
-                    logger.error(f"ERROR: Failed to connect to API Server after {max_retries} retries")
-                    # Check if process is still running
-                    if process.poll() is None:
-                        logger.error("   API Server process is still running but not responding")
-                        logger.error("   This could indicate a configuration or startup issue")
-                    else:
-                        logger.error(f"   API Server process has exited with code: {process.returncode}")
-                    process.terminate()
-                    return None
-            
-            time.sleep(5)  # Wait 5 seconds between retries
+                last_error = e  # not listening yet
+            time.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
+        logger.error(f"ERROR: API Server did not respond within {API_STARTUP_TIMEOUT}s (last error: {last_error})")
+        logger.error("   API Server process is still running but not responding")
+        logger.error("   This could indicate a configuration or startup issue")
+        process.terminate()
+        return None
             
     except Exception as e:
         logger.error(f"ERROR: Failed to start API Server: {e}")
@@ -32,12 +32,17 @@ import logging
 import glob
 import uuid
 import copy
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 from urllib.parse import quote
 
 # --- Third-party Imports ---
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 # --- Import Flask for Web UI Approval ---
 try:
@@ -65,6 +70,28 @@ except ImportError:
     print("ERROR: FastAPI library not found. Please install it: pip install fastapi uvicorn")
     sys.exit(1)
 
+# --- Optional orjson for faster JSON on polling/submission hot paths ---
+try:
+    import orjson
+    fast_json_loads = orjson.loads
+    fast_json_dumps = orjson.dumps
+    print("DEBUG: orjson imported successfully.")
+except ImportError:
+    fast_json_loads = json.loads
+    fast_json_dumps = lambda obj: json.dumps(obj).encode("utf-8")
+    print("DEBUG: orjson not found, using stdlib json (pip install orjson for faster parsing).")
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# --- Optional watchdog for event-driven approval file monitoring ---
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    print("DEBUG: watchdog imported successfully.")
+except ImportError:
+    Observer = None
+    print("DEBUG: watchdog not found, approvals file will be polled (pip install watchdog).")
+
 # --- Load environment variables from parent directory (.env) ---
 env_path = Path(__file__).resolve().parent.parent.parent / ".env"
 load_dotenv(env_path)
@@ -77,11 +104,22 @@ MAX_API_RETRIES = 3
 API_RETRY_DELAY = 5
 REQUEST_TIMEOUT = 60
 POLLING_INTERVAL = 10
+MAX_POLLING_INTERVAL = 30  # Cap for adaptive backoff while no job changes state
+POLLING_BACKOFF_FACTOR = 1.5
+# Seconds between timeout-only progress bar redraws; must exceed the poll sleep (up to MAX_POLLING_INTERVAL
+# for images, 2 * POLLING_INTERVAL for videos) or every tick redraws anyway
+PBAR_DESCRIPTION_REFRESH = POLLING_INTERVAL * 6
 POLLING_TIMEOUT_IMAGE = 1800
 POLLING_TIMEOUT_VIDEO = 3600
+COPY_WORKERS = 8  # Parallel file copies (I/O bound, helps most across drives)
+IMAGE_EXTENSIONS = (".png", ".jpg")
+PROMPT_CACHE_SIZE = 1024
+STATUS_CHECK_WORKERS = 8  # Concurrent /history lookups per polling tick
 
 APPROVAL_SERVER_PORT = 5006  # Different port for music pipeline
 APPROVAL_FILENAME = "approved_images.json"
+APPROVAL_POLL_INTERVAL = 5  # Used when watchdog is unavailable
+APPROVAL_RECHECK_INTERVAL = 30  # Sanity re-check even without file events
 APPROVED_IMAGES_SUBFOLDER = "approved_images_for_video"
 
 # API Server Constants
@@ -128,6 +166,15 @@ logger.addHandler(console_handler)
 print("DEBUG: Logging setup complete.")
 logger.info("🎵 Starting All-In-One Music Pipeline")
 
+# --- Shared HTTP Session (connection pooling for ComfyUI / API server calls) ---
+SESSION = requests.Session()
+_http_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=0)
+SESSION.mount("http://", _http_adapter)
+SESSION.mount("https://", _http_adapter)
+
+# --- Prompt de-duplication cache (prompt hash -> ComfyUI prompt_id), LRU ordered ---
+PROMPT_CACHE = OrderedDict()
+
 # --- Global Variables for API Server ---
 api_server_process = None
 api_app = None
@@ -174,7 +221,7 @@ def check_comfyui_running():
     logger.info("Checking if ComfyUI is running...")
     
     try:
-        response = requests.get("http://127.0.0.1:8188/", timeout=10)
+        response = SESSION.get("http://127.0.0.1:8188/", timeout=10)
         if response.status_code == 200:
             logger.info("✅ ComfyUI is running and accessible")
             return True
@@ -507,9 +554,9 @@ def create_api_server():
             submit_payload = {"prompt": wf, "client_id": client_id}
             logger.info(f"[{client_id}] Submitting {workflow_type} workflow to ComfyUI for segment {request.segment_id}...")
             
-            response = requests.post(COMFYUI_PROMPT_URL, json=submit_payload, timeout=COMFYUI_TIMEOUT)
+            response = SESSION.post(COMFYUI_PROMPT_URL, data=fast_json_dumps(submit_payload), headers=JSON_HEADERS, timeout=COMFYUI_TIMEOUT)
             response.raise_for_status()
-            response_data = response.json()
+            response_data = fast_json_loads(response.content)
             
             prompt_id = response_data.get("prompt_id")
             if prompt_id:
@@ -653,7 +700,7 @@ def start_embedded_api_server():
         max_retries = 6
         for retry in range(max_retries):
             try:
-                response = requests.get(f"http://127.0.0.1:{API_SERVER_PORT}/", timeout=10)
+                response = SESSION.get(f"http://127.0.0.1:{API_SERVER_PORT}/", timeout=10)
                 if response.status_code == 200:
                     logger.info("✅ Embedded API Server started successfully")
                     return server_thread
@@ -675,6 +722,13 @@ def start_embedded_api_server():
 # IMAGE GENERATION FUNCTIONS
 # =============================================================================
 
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
+def prompt_preview(prompt_text, max_length=100):
+    """Short display form of a prompt, only adding '...' when it was actually truncated"""
+    if len(prompt_text) > max_length:
+        return prompt_text[:max_length] + "..."
+    return prompt_text
+
 def generate_images_from_music(config, prompts, output_run_dir, all_images_dir):
     """Generate images for each music segment prompt"""
     logger.info(f"🎨 Starting image generation for {len(prompts)} music segments")
@@ -682,7 +736,17 @@ def generate_images_from_music(config, prompts, output_run_dir, all_images_dir):
     # Prepare for ComfyUI path generation
     output_subfolder_for_comfyui = f"{output_run_dir.name}/all_images"
     
+    # Fields shared by every segment request, built once
+    base_request_data = {
+        "face": None,  # No face for music-based generation
+        "output_subfolder": output_subfolder_for_comfyui,
+        "filename_prefix_text": "music_segment",
+        "video_start_image_path": None
+    }
+    
     generation_requests = []
+    # Identical prompts (e.g. repeated chorus segments) can reuse an earlier job's images
+    use_prompt_cache = config.get("allow_prompt_cache", False)
     
     for i, prompt_info in enumerate(prompts, 1):
         segment_id = prompt_info["segment_id"]
@@ -690,15 +754,23 @@ def generate_images_from_music(config, prompts, output_run_dir, all_images_dir):
         
         logger.info(f"📝 Processing segment {segment_id}/{len(prompts)}: {prompt_info['start_time']}-{prompt_info['end_time']}")
         
-        # Prepare request data
-        request_data = {
-            "prompt": prompt_text,
-            "segment_id": segment_id,
-            "face": None,  # No face for music-based generation
-            "output_subfolder": output_subfolder_for_comfyui,
-            "filename_prefix_text": f"music_segment",
-            "video_start_image_path": None
-        }
+        if use_prompt_cache:
+            cache_key = hashlib.blake2b(prompt_text.encode("utf-8"), digest_size=8).hexdigest()
+            cached_prompt_id = PROMPT_CACHE.get(cache_key)
+            if cached_prompt_id:
+                PROMPT_CACHE.move_to_end(cache_key)
+                logger.info(f"♻️ Segment {segment_id} has the same prompt as an earlier segment, reusing Prompt ID: {cached_prompt_id}")
+                generation_requests.append({
+                    "segment_id": segment_id,
+                    "prompt_id": cached_prompt_id,
+                    "prompt_text": prompt_preview(prompt_text),
+                    "start_time": prompt_info["start_time"],
+                    "end_time": prompt_info["end_time"]
+                })
+                continue
+        
+        # Prepare request data (only prompt and segment vary per request)
+        request_data = {**base_request_data, "prompt": prompt_text, "segment_id": segment_id}
         
         # Send request to API server with retry mechanism
         submitted = False
@@ -706,14 +778,15 @@ def generate_images_from_music(config, prompts, output_run_dir, all_images_dir):
             try:
                 logger.info(f"📤 Sending generation request for segment {segment_id} (Attempt {attempt}/{MAX_API_RETRIES})...")
                 
-                response = requests.post(
+                response = SESSION.post(
                     f"http://127.0.0.1:{API_SERVER_PORT}/generate/image",
-                    json=request_data,
+                    data=fast_json_dumps(request_data),
+                    headers=JSON_HEADERS,
                     timeout=REQUEST_TIMEOUT
                 )
                 
                 response.raise_for_status()
-                result = response.json()
+                result = fast_json_loads(response.content)
                 
                 api_status = result.get('status', 'N/A')
                 prompt_id = result.get('prompt_id', 'N/A')
@@ -729,10 +802,14 @@ def generate_images_from_music(config, prompts, output_run_dir, all_images_dir):
                     generation_requests.append({
                         "segment_id": segment_id,
                         "prompt_id": prompt_id,
-                        "prompt_text": prompt_text[:100] + "...",
+                        "prompt_text": prompt_preview(prompt_text),
                         "start_time": prompt_info["start_time"],
                         "end_time": prompt_info["end_time"]
                     })
+                    if use_prompt_cache:
+                        PROMPT_CACHE[cache_key] = prompt_id
+                        if len(PROMPT_CACHE) > PROMPT_CACHE_SIZE:
+                            PROMPT_CACHE.popitem(last=False)
                     submitted = True
                     break
                 else:
@@ -779,35 +856,55 @@ def generate_images_from_music(config, prompts, output_run_dir, all_images_dir):
 # PROGRESS TRACKING FUNCTIONS
 # =============================================================================
 
-def check_comfyui_job_status(comfyui_base_url, prompt_id):
-    """Check status of a single job using ComfyUI history API (working pattern)"""
+def get_comfyui_queue_ids(comfyui_base_url):
+    """Fetch the global ComfyUI queue once and return (running_ids, pending_ids), or None on failure"""
+    try:
+        queue_response = SESSION.get(f"{comfyui_base_url}/queue", timeout=10)
+        if queue_response.status_code != 200:
+            return None
+        queue_data = fast_json_loads(queue_response.content)
+        # job format: [number, prompt_id, prompt_data]
+        running_ids = {job[1] for job in queue_data.get("queue_running", [])}
+        pending_ids = {job[1] for job in queue_data.get("queue_pending", [])}
+        return running_ids, pending_ids
+    except Exception as e:
+        logger.debug(f"Error fetching ComfyUI queue: {e}")
+        return None
+
+def check_comfyui_job_status(comfyui_base_url, prompt_id, queue_ids=None):
+    """Check status of a single job using ComfyUI history API (working pattern)
+
+    If queue_ids (from get_comfyui_queue_ids) is given, jobs still in the queue are
+    classified without any request and /history is only fetched for the rest.
+    """
+    if queue_ids is not None:
+        running_ids, pending_ids = queue_ids
+        if prompt_id in running_ids:
+            return {"status": "running"}
+        if prompt_id in pending_ids:
+            return {"status": "pending"}
+    
     try:
         history_url = f"{comfyui_base_url}/history/{prompt_id}"
-        history_response = requests.get(history_url, timeout=10)
+        history_response = SESSION.get(history_url, timeout=10)
         
         if history_response.status_code == 200:
-            history_data = history_response.json()
+            history_data = fast_json_loads(history_response.content)
             return {"status": "completed", "history_data": history_data}
         elif history_response.status_code == 404:
             # Job not in history - check if it's in queue
-            queue_response = requests.get(f"{comfyui_base_url}/queue", timeout=10)
-            if queue_response.status_code == 200:
-                queue_data = queue_response.json()
-                
-                # Check running queue
-                for job in queue_data.get("queue_running", []):
-                    if job[1] == prompt_id:  # job format: [number, prompt_id, prompt_data]
-                        return {"status": "running"}
-                
-                # Check pending queue
-                for job in queue_data.get("queue_pending", []):
-                    if job[1] == prompt_id:
-                        return {"status": "pending"}
-                
-                # Not found anywhere - assume pending
-                return {"status": "pending"}
-            else:
-                return {"status": "unknown"}
+            if queue_ids is None:
+                queue_ids = get_comfyui_queue_ids(comfyui_base_url)
+                if queue_ids is None:
+                    return {"status": "unknown"}
+                running_ids, pending_ids = queue_ids
+                if prompt_id in running_ids:
+                    return {"status": "running"}
+                if prompt_id in pending_ids:
+                    return {"status": "pending"}
+            
+            # Not found anywhere - assume pending
+            return {"status": "pending"}
         else:
             return {"status": "unknown"}
             
@@ -815,6 +912,16 @@ def check_comfyui_job_status(comfyui_base_url, prompt_id):
         logger.debug(f"Error checking status for {prompt_id}: {e}")
         return {"status": "unknown"}
 
+def check_comfyui_job_statuses(comfyui_base_url, prompt_ids):
+    """Check many jobs at once: one /queue request, then /history lookups run concurrently"""
+    queue_ids = get_comfyui_queue_ids(comfyui_base_url)
+    with ThreadPoolExecutor(max_workers=STATUS_CHECK_WORKERS) as executor:
+        statuses = executor.map(
+            lambda prompt_id: check_comfyui_job_status(comfyui_base_url, prompt_id, queue_ids),
+            prompt_ids
+        )
+        return dict(zip(prompt_ids, statuses))
+
 def get_output_filenames_from_history(history_data):
     """Extract output filenames from ComfyUI history (working pattern)"""
     try:
@@ -842,11 +949,71 @@ def get_output_filenames_from_history(history_data):
         logger.debug(f"Error extracting filenames from history: {e}")
         return []
 
+def list_image_files(directory):
+    """List PNG/JPG files in a directory with a single scandir pass"""
+    with os.scandir(directory) as entries:
+        return [
+            Path(entry.path) for entry in entries
+            if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS)
+        ]
+
+def count_image_files(directory):
+    """Count PNG/JPG files in a directory without building a list of paths"""
+    with os.scandir(directory) as entries:
+        return sum(1 for entry in entries if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS))
+
+def copy_files_parallel(file_paths, dest_dir):
+    """Copy files into dest_dir using a thread pool, returning how many were copied"""
+    def copy_one(file_path):
+        try:
+            shutil.copy2(file_path, dest_dir / file_path.name)
+            logger.debug(f"Copied {file_path.name} to {dest_dir}")
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to copy {file_path.name}: {e}")
+            return False
+    
+    with ThreadPoolExecutor(max_workers=COPY_WORKERS) as executor:
+        return sum(executor.map(copy_one, file_paths))
+
+def finalize_image_outputs(job_details, all_images_dir, comfyui_output_base):
+    """Copy outputs of completed jobs (from history data) into all_images_dir and return the image count"""
+    candidate_files = [
+        comfyui_output_base / filename
+        for details in job_details.values()
+        if details["status"] == "completed"
+        for filename in details["output_files"]
+    ]
+    
+    with ThreadPoolExecutor(max_workers=COPY_WORKERS) as executor:
+        exists_flags = list(executor.map(Path.exists, candidate_files))
+    
+    found_files = []
+    for file_path, exists in zip(candidate_files, exists_flags):
+        if exists:
+            found_files.append(file_path)
+            logger.info(f"Found output file: {file_path}")
+        else:
+            logger.warning(f"History reported file {file_path}, but it doesn't exist on disk!")
+    
+    logger.info(f"📁 Found {len(found_files)} generated images using history data")
+    
+    if not found_files:
+        return 0
+    
+    # Copy found files to expected directory for approval workflow
+    logger.info("📋 Copying images to expected directory for approval...")
+    all_images_dir.mkdir(parents=True, exist_ok=True)
+    copy_files_parallel(found_files, all_images_dir)
+    
+    # Recount images in approval directory
+    actual_count = count_image_files(all_images_dir)
+    logger.info(f"📁 Images ready for approval: {actual_count}")
+    return actual_count
+
 def wait_for_image_generation_with_tracking(all_images_dir, generation_requests):
     """Wait for all images to be generated using working automation pattern with smart timeout"""
     logger.info(f"⏳ Tracking image generation progress (using working pattern)...")
-    logger.info(f"   Total jobs: {len(generation_requests)}")
-    logger.info(f"   Expected images: {len(generation_requests) * 4}")  # 4 images per segment
     logger.info(f"   Output directory: {all_images_dir}")
     
     comfyui_base_url = "http://127.0.0.1:8188"
@@ -867,8 +1034,16 @@ def wait_for_image_generation_with_tracking(all_images_dir, generation_requests)
             "output_files": []
         }
     
-    with tqdm(total=len(generation_requests), desc="Processing Jobs", unit="job") as pbar:
+    # Segments that reused a cached prompt share a prompt_id, so track unique jobs
+    total_jobs = len(job_details)
+    logger.info(f"   Total jobs: {total_jobs}")
+    logger.info(f"   Expected images: {total_jobs * 4}")  # 4 images per segment
+    
+    with tqdm(total=total_jobs, desc="Processing Jobs", unit="job") as pbar:
         last_completed = 0
+        last_status_counts = None
+        last_description_update = 0
+        current_interval = POLLING_INTERVAL
         
         while True:
             current_time = time.time()
@@ -880,10 +1055,14 @@ def wait_for_image_generation_with_tracking(all_images_dir, generation_requests)
             failed_count = 0
             progress_made = False
             
+            # Fetch all unfinished statuses up front (one /queue request, concurrent /history lookups)
+            unfinished_ids = [pid for pid, details in job_details.items() if details["status"] != "completed"]
+            job_statuses = check_comfyui_job_statuses(comfyui_base_url, unfinished_ids)
+            
             # Check each job individually using working pattern
             for prompt_id, details in job_details.items():
                 if details["status"] != "completed":
-                    job_status = check_comfyui_job_status(comfyui_base_url, prompt_id)
+                    job_status = job_statuses[prompt_id]
                     
                     # Detect progress (status change)
                     if job_status["status"] != details["status"]:
@@ -922,10 +1101,15 @@ def wait_for_image_generation_with_tracking(all_images_dir, generation_requests)
                 last_completed = completed_count
             
             # Update progress bar description with timeout info
-            remaining_timeout = max(0, PROGRESS_TIMEOUT - time_since_progress)
-            pbar.set_description(f"Jobs - Done: {completed_count}, Running: {running_count}, Pending: {pending_count}, Failed: {failed_count} | Timeout: {remaining_timeout:.0f}s")
+            # Redraw only when counts change, or periodically to refresh the timeout countdown
+            status_counts = (completed_count, running_count, pending_count, failed_count)
+            if status_counts != last_status_counts or current_time - last_description_update > PBAR_DESCRIPTION_REFRESH:
+                remaining_timeout = max(0, PROGRESS_TIMEOUT - time_since_progress)
+                pbar.set_description(f"Jobs - Done: {completed_count}, Running: {running_count}, Pending: {pending_count}, Failed: {failed_count} | Timeout: {remaining_timeout:.0f}s")
+                last_status_counts = status_counts
+                last_description_update = current_time
             
-            logger.info(f"📊 Job Status - Completed: {completed_count}/{len(generation_requests)}, Running: {running_count}, Pending: {pending_count}, Failed: {failed_count}")
+            logger.info(f"📊 Job Status - Completed: {completed_count}/{total_jobs}, Running: {running_count}, Pending: {pending_count}, Failed: {failed_count}")
             logger.info(f"⏱️ Time since last progress: {time_since_progress:.1f}s / {PROGRESS_TIMEOUT}s, Total elapsed: {total_elapsed/60:.1f}min")
             
             # Check timeout condition
@@ -935,43 +1119,11 @@ def wait_for_image_generation_with_tracking(all_images_dir, generation_requests)
                 break
             
             # Check if all jobs are done (completed or failed)
-            if completed_count + failed_count >= len(generation_requests):
+            if completed_count + failed_count >= total_jobs:
                 logger.info(f"✅ All jobs processed! Completed: {completed_count}, Failed: {failed_count}")
                 
-                # Use working pattern: find files based on ComfyUI history data
-                found_files = []
-                for prompt_id, details in job_details.items():
-                    if details["status"] == "completed" and details["output_files"]:
-                        for filename in details["output_files"]:
-                            # Build actual file path in ComfyUI output directory
-                            file_path = comfyui_output_base / filename
-                            if file_path.exists():
-                                found_files.append(file_path)
-                                logger.info(f"Found output file: {file_path}")
-                            else:
-                                logger.warning(f"History reported file {file_path}, but it doesn't exist on disk!")
-                
-                logger.info(f"📁 Found {len(found_files)} generated images using history data")
-                
-                # Copy found files to expected directory for approval workflow
-                if found_files:
-                    logger.info("📋 Copying images to expected directory for approval...")
-                    all_images_dir.mkdir(parents=True, exist_ok=True)
-                    
-                    for file_path in found_files:
-                        try:
-                            dest_path = all_images_dir / file_path.name
-                            shutil.copy2(file_path, dest_path)
-                            logger.debug(f"Copied {file_path.name} to approval directory")
-                        except Exception as e:
-                            logger.warning(f"Failed to copy {file_path.name}: {e}")
-                    
-                    # Recount images in approval directory
-                    image_files = list(all_images_dir.glob("*.png")) + list(all_images_dir.glob("*.jpg"))
-                    actual_count = len(image_files)
-                    logger.info(f"📁 Images ready for approval: {actual_count}")
-                else:
-                    actual_count = 0
+                actual_count = finalize_image_outputs(job_details, all_images_dir, comfyui_output_base)
+                if actual_count == 0:
                     logger.warning("⚠️ No images found even with history-based tracking!")
                 
                 pbar.close()
@@ -981,49 +1133,24 @@ def wait_for_image_generation_with_tracking(all_images_dir, generation_requests)
             if failed_count > 0:
                 logger.warning(f"⚠️ {failed_count} jobs failed, but continuing with remaining jobs...")
             
-            time.sleep(POLLING_INTERVAL)
+            # Poll quickly while jobs are changing state, back off during quiet periods
+            if progress_made:
+                current_interval = POLLING_INTERVAL
+            else:
+                current_interval = min(current_interval * POLLING_BACKOFF_FACTOR, MAX_POLLING_INTERVAL)
+            time.sleep(current_interval)
     
     # Handle timeout case - process any completed jobs we have
     logger.info(f"🕐 Processing timeout case. Completed jobs: {completed_count}")
     
     # Use working pattern: find files based on ComfyUI history data (even for partial completion)
-    found_files = []
-    for prompt_id, details in job_details.items():
-        if details["status"] == "completed" and details["output_files"]:
-            for filename in details["output_files"]:
-                # Build actual file path in ComfyUI output directory
-                file_path = comfyui_output_base / filename
-                if file_path.exists():
-                    found_files.append(file_path)
-                    logger.info(f"Found output file: {file_path}")
-                else:
-                    logger.warning(f"History reported file {file_path}, but it doesn't exist on disk!")
-    
-    logger.info(f"📁 Found {len(found_files)} generated images using history data")
+    actual_count = finalize_image_outputs(job_details, all_images_dir, comfyui_output_base)
     
-    # Copy found files to expected directory for approval workflow
-    if found_files:
-        logger.info("📋 Copying images to expected directory for approval...")
-        all_images_dir.mkdir(parents=True, exist_ok=True)
-        
-        for file_path in found_files:
-            try:
-                dest_path = all_images_dir / file_path.name
-                shutil.copy2(file_path, dest_path)
-                logger.debug(f"Copied {file_path.name} to approval directory")
-            except Exception as e:
-                logger.warning(f"Failed to copy {file_path.name}: {e}")
-        
-        # Recount images in approval directory
-        image_files = list(all_images_dir.glob("*.png")) + list(all_images_dir.glob("*.jpg"))
-        actual_count = len(image_files)
-        logger.info(f"📁 Images ready for approval: {actual_count}")
-        
-        # Return True if we have at least some images, even if not all completed
-        if actual_count > 0:
-            logger.info(f"✅ Proceeding with {actual_count} images (partial completion due to timeout)")
-            pbar.close()
-            return True
+    # Return True if we have at least some images, even if not all completed
+    if actual_count > 0:
+        logger.info(f"✅ Proceeding with {actual_count} images (partial completion due to timeout)")
+        pbar.close()
+        return True
     
     logger.warning("⚠️ No usable images found even with timeout handling!")
     pbar.close()
@@ -1062,18 +1189,50 @@ def start_telegram_approval(all_images_dir):
         logger.error(f"❌ Failed to start Telegram approval: {e}")
         return False
 
+def start_approvals_watcher(changed_event):
+    """Start a watchdog observer that sets changed_event when the approvals JSON changes (None if unavailable)"""
+    if Observer is None:
+        return None
+    
+    class ApprovalsFileHandler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            paths = (event.src_path, getattr(event, "dest_path", "") or "")
+            if any(Path(path).name == TELEGRAM_APPROVALS_JSON.name for path in paths):
+                changed_event.set()
+    
+    try:
+        TELEGRAM_APPROVALS_DIR.mkdir(parents=True, exist_ok=True)
+        observer = Observer()
+        observer.schedule(ApprovalsFileHandler(), str(TELEGRAM_APPROVALS_DIR), recursive=False)
+        observer.start()
+        return observer
+    except Exception as e:
+        logger.warning(f"⚠️ Could not start approvals file watcher, falling back to polling: {e}")
+        return None
+
 def wait_for_approvals():
     """Wait for user to approve images via Telegram"""
     logger.info("⏳ Waiting for Telegram approvals...")
     logger.info("   Use your Telegram bot to approve/reject images")
     logger.info("   Press Ctrl+C to skip approval and use all images")
     
+    approvals_changed = threading.Event()
+    observer = start_approvals_watcher(approvals_changed)
+    last_mtime = None
+    
     try:
         while True:
-            if TELEGRAM_APPROVALS_JSON.exists():
+            try:
+                current_mtime = TELEGRAM_APPROVALS_JSON.stat().st_mtime
+            except FileNotFoundError:
+                current_mtime = None
+            
+            # Only re-parse when the file actually changed since the last successful read
+            if current_mtime is not None and current_mtime != last_mtime:
                 try:
-                    with open(TELEGRAM_APPROVALS_JSON, 'r') as f:
-                        approvals = json.load(f)
+                    with open(TELEGRAM_APPROVALS_JSON, 'rb') as f:
+                        approvals = fast_json_loads(f.read())
+                    last_mtime = current_mtime
                     
                     approved_count = len([img for img in approvals.values() if img.get('approved', False)])
                     
@@ -1084,31 +1243,41 @@ def wait_for_approvals():
                 except json.JSONDecodeError:
                     pass  # File might be being written
             
-            time.sleep(5)
+            if observer:
+                # Wake on file events; 1s slices keep Ctrl+C responsive on Windows
+                deadline = time.time() + APPROVAL_RECHECK_INTERVAL
+                while not approvals_changed.wait(1) and time.time() < deadline:
+                    pass
+                approvals_changed.clear()
+            else:
+                time.sleep(APPROVAL_POLL_INTERVAL)
             
     except KeyboardInterrupt:
         logger.info("⚠️ Approval skipped by user. Using all generated images.")
         return None
+    finally:
+        if observer:
+            observer.stop()
+            observer.join()
 
 def copy_approved_images(all_images_dir, approved_images_dir, approvals):
     """Copy approved images to the video generation folder"""
     if not approvals:
         # Use all images if no approvals
         logger.info("📋 No approvals found, copying all images...")
-        image_files = list(all_images_dir.glob("*.png")) + list(all_images_dir.glob("*.jpg"))
-        for img_file in image_files:
-            shutil.copy2(img_file, approved_images_dir / img_file.name)
-        logger.info(f"✅ Copied {len(image_files)} images for video generation")
-        return len(image_files)
+        image_files = list_image_files(all_images_dir)
+        copied_count = copy_files_parallel(image_files, approved_images_dir)
+        logger.info(f"✅ Copied {copied_count} images for video generation")
+        return copied_count
     
     # Copy only approved images
-    approved_count = 0
+    approved_files = []
     for img_name, img_data in approvals.items():
         if img_data.get('approved', False):
             src_path = all_images_dir / img_name
             if src_path.exists():
-                shutil.copy2(src_path, approved_images_dir / img_name)
-                approved_count += 1
+                approved_files.append(src_path)
+    approved_count = copy_files_parallel(approved_files, approved_images_dir)
     
     logger.info(f"✅ Copied {approved_count} approved images for video generation")
     return approved_count
@@ -1139,7 +1308,7 @@ def generate_videos_from_approved_images(config, approved_images_dir, prompts, o
         return 0
     
     # Get list of approved images
-    approved_images = list(approved_images_dir.glob("*.png")) + list(approved_images_dir.glob("*.jpg"))
+    approved_images = list_image_files(approved_images_dir)
     if not approved_images:
         logger.warning("⚠️ No approved images found for video generation")
         return 0
@@ -1194,14 +1363,15 @@ def generate_videos_from_approved_images(config, approved_images_dir, prompts, o
             try:
                 logger.info(f"📤 Sending video generation request {idx} (Attempt {attempt}/{MAX_API_RETRIES})...")
                 
-                response = requests.post(
+                response = SESSION.post(
                     f"http://127.0.0.1:{API_SERVER_PORT}/generate/video",
-                    json=request_data,
+                    data=fast_json_dumps(request_data),
+                    headers=JSON_HEADERS,
                     timeout=REQUEST_TIMEOUT
                 )
                 
                 response.raise_for_status()
-                result = response.json()
+                result = fast_json_loads(response.content)
                 
                 api_status = result.get('status', 'N/A')
                 prompt_id = result.get('prompt_id', 'N/A')
@@ -1287,6 +1457,8 @@ def wait_for_video_generation_with_tracking(video_requests):
     
     with tqdm(total=len(video_requests), desc="Processing Videos", unit="video") as pbar:
         last_completed = 0
+        last_status_counts = None
+        last_description_update = 0
         
         while True:
             current_time = time.time()
@@ -1298,10 +1470,14 @@ def wait_for_video_generation_with_tracking(video_requests):
             failed_count = 0
             progress_made = False
             
+            # Fetch all unfinished statuses up front (one /queue request, concurrent /history lookups)
+            unfinished_ids = [pid for pid, details in job_details.items() if details["status"] != "completed"]
+            job_statuses = check_comfyui_job_statuses(comfyui_base_url, unfinished_ids)
+            
             # Check each video job
             for prompt_id, details in job_details.items():
                 if details["status"] != "completed":
-                    job_status = check_comfyui_job_status(comfyui_base_url, prompt_id)
+                    job_status = job_statuses[prompt_id]
                     
                     # Detect progress
                     if job_status["status"] != details["status"]:
@@ -1334,8 +1510,13 @@ def wait_for_video_generation_with_tracking(video_requests):
                 last_completed = completed_count
             
             # Update progress bar description
-            remaining_timeout = max(0, PROGRESS_TIMEOUT - time_since_progress)
-            pbar.set_description(f"Videos - Done: {completed_count}, Running: {running_count}, Pending: {pending_count}, Failed: {failed_count} | Timeout: {remaining_timeout:.0f}s")
+            # Redraw only when counts change, or periodically to refresh the timeout countdown
+            status_counts = (completed_count, running_count, pending_count, failed_count)
+            if status_counts != last_status_counts or current_time - last_description_update > PBAR_DESCRIPTION_REFRESH:
+                remaining_timeout = max(0, PROGRESS_TIMEOUT - time_since_progress)
+                pbar.set_description(f"Videos - Done: {completed_count}, Running: {running_count}, Pending: {pending_count}, Failed: {failed_count} | Timeout: {remaining_timeout:.0f}s")
+                last_status_counts = status_counts
+                last_description_update = current_time
             
             logger.info(f"📊 Video Status - Completed: {completed_count}/{len(video_requests)}, Running: {running_count}, Pending: {pending_count}, Failed: {failed_count}")
             
@@ -1477,7 +1658,7 @@ def main():
             
             if generation_success:
                 # Count total generated images
-                total_images = len(list(all_images_dir.glob("*.png")) + list(all_images_dir.glob("*.jpg")))
+                total_images = count_image_files(all_images_dir)
                 
                 # Step 11: Start Telegram approval
                 telegram_process = start_telegram_approval(all_images_dir)
@@ -1,6 +1,7 @@
 import os
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 # Load .env variables
 load_dotenv()
@@ -9,13 +10,19 @@ BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 MESSAGE = "✅ Your Python script has completed successfully!"
 
+# Shared session so repeated notifications reuse the TLS connection to Telegram
+SESSION = requests.Session()
+_http_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=0)
+SESSION.mount("http://", _http_adapter)
+SESSION.mount("https://", _http_adapter)
+
 def send_telegram_message(bot_token, chat_id, message):
     url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
     payload = {
         "chat_id": chat_id,
         "text": message
     }
-    response = requests.post(url, data=payload)
+    response = SESSION.post(url, data=payload)
     print(f"[INFO] Message status: {response.status_code}")
     print(f"[INFO] Response: {response.json()}")
 
@@ -1,20 +1,105 @@
-import os
+import queue
+import atexit
+import threading
+import time
 import requests
-from dotenv import load_dotenv
+import env_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-load_dotenv()  # loads .env file
+BOT_TOKEN = env_cache.get("TELEGRAM_BOT_TOKEN")
+CHAT_ID = env_cache.get("TELEGRAM_CHAT_ID")
 
-BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
-CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+# One keep-alive session for all notifications (avoids a TLS handshake per message)
+_URL = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_connections=2,
+    pool_maxsize=10,
+    # Telegram answers rate limits with 429 + Retry-After; back off instead of dropping the message
+    max_retries=Retry(
+        total=5,
+        backoff_factor=1.0,
+        status_forcelist=[429, 500, 502, 503, 504],
+        respect_retry_after_header=True,
+        allowed_methods=frozenset(["POST"]),
+    ),
+))
 
-def notify_telegram(message):
-    if not BOT_TOKEN or not CHAT_ID:
-        print("[WARN] Missing Telegram credentials.")
-        return
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
-    payload = {"chat_id": CHAT_ID, "text": message}
+# Messages are queued and coalesced by a background thread into as few sendMessage calls as possible
+MAX_BATCH_MESSAGES = 20
+BATCH_WINDOW_SECONDS = 0.2
+TELEGRAM_MAX_TEXT = 4096
+BATCH_SEPARATOR = "\n---\n"
+
+_queue = queue.Queue()
+_flusher = None
+_flusher_lock = threading.Lock()
+
+def _send(text, _url=_URL, _sess=_session, _chat_id=CHAT_ID):
     try:
-        resp = requests.post(url, data=payload, timeout=10)
+        resp = _sess.post(_url, data={"chat_id": _chat_id, "text": text}, timeout=10)
         print(f"[INFO] Notified Telegram: {resp.status_code} {resp.text}")
     except Exception as e:
         print(f"[ERROR] Telegram notify failed: {e}")
+
+def _pack(messages):
+    """Join messages into as few chunks as fit in one Telegram message each."""
+    chunks = []
+    current = ""
+    for message in messages:
+        candidate = f"{current}{BATCH_SEPARATOR}{message}" if current else message
+        if current and len(candidate) > TELEGRAM_MAX_TEXT:
+            chunks.append(current)
+            current = message
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _flush_loop():
+    while True:
+        batch = [_queue.get()]
+        deadline = time.monotonic() + BATCH_WINDOW_SECONDS
+        while len(batch) < MAX_BATCH_MESSAGES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        for chunk in _pack(batch):
+            _send(chunk)
+        for _ in batch:
+            _queue.task_done()
+
+def _ensure_flusher():
+    global _flusher
+    with _flusher_lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name="telegram-notify", daemon=True)
+            _flusher.start()
+
+def flush_notifications():
+    """Block until every queued notification has been sent."""
+    if _flusher is not None:
+        _queue.join()
+
+# Don't lose queued messages when the calling script exits
+atexit.register(flush_notifications)
+
+# Credentials are fixed at import, so pick the implementation once instead of checking per call
+if not BOT_TOKEN or not CHAT_ID:
+    def notify_telegram(message, flush=False):
+        print("[WARN] Missing Telegram credentials.")
+else:
+    def notify_telegram(message, flush=False):
+        if flush:
+            # Send anything already queued first so messages stay in order
+            flush_notifications()
+            _send(message)
+            return
+        _ensure_flusher()
+        _queue.put(message)
@@ -6,74 +6,140 @@ Fix access token permissions for Instagram Graph API
 import requests
 import json
 import webbrowser
-import os
-from dotenv import load_dotenv
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from urllib3.util.retry import Retry
+import env_cache
+import http_utils
 
-# Load environment variables
-load_dotenv()
+# One keep-alive session for every Graph API call; retries back off on throttling (429) and 5xx
+# (responses decode with orjson when installed, see http_utils)
+graph_session = http_utils.create_session(
+    "https://graph.facebook.com",
+    retries=Retry(
+        total=5,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        respect_retry_after_header=True
+    ),
+    pool_connections=4,
+    pool_maxsize=10
+)
 
-# Get credentials from environment variables
-APP_ID = os.getenv("INSTAGRAM_APP_ID")
-APP_SECRET = os.getenv("INSTAGRAM_APP_SECRET")
-CURRENT_TOKEN = os.getenv("INSTAGRAM_ACCESS_TOKEN")
+def write_json(path, data):
+    """Write data as indented JSON, preferring orjson."""
+    orjson = http_utils.orjson
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
 
-# Validate required environment variables
-required_vars = {
-    "INSTAGRAM_APP_ID": APP_ID,
-    "INSTAGRAM_APP_SECRET": APP_SECRET,
-    "INSTAGRAM_ACCESS_TOKEN": CURRENT_TOKEN
-}
+def graph_batch(access_token, relative_urls):
+    """Run several Graph GET requests in one HTTP round trip via the batch endpoint."""
+    batch = [{"method": "GET", "relative_url": url} for url in relative_urls]
+    response = graph_session.post(
+        "https://graph.facebook.com/v18.0/",
+        data={"access_token": access_token, "batch": json.dumps(batch)},
+        timeout=10
+    )
+    response.raise_for_status()
+    
+    results = []
+    for url, item in zip(relative_urls, response.json()):
+        if not item or item.get("code") != 200:
+            body = item.get("body") if item else "no response"
+            raise requests.exceptions.HTTPError(f"Batch request '{url}' failed: {body}")
+        results.append(http_utils.loads(item["body"]))
+    return results
 
-missing_vars = [var_name for var_name, var_value in required_vars.items() if not var_value]
-if missing_vars:
+@dataclass(frozen=True)
+class GraphAppConfig:
+    """Instagram Graph app credentials, read and validated once at startup."""
+    app_id: str
+    app_secret: str
+    access_token: str
+    
+    @classmethod
+    def from_env(cls):
+        values = {
+            "INSTAGRAM_APP_ID": env_cache.get("INSTAGRAM_APP_ID"),
+            "INSTAGRAM_APP_SECRET": env_cache.get("INSTAGRAM_APP_SECRET"),
+            "INSTAGRAM_ACCESS_TOKEN": env_cache.get("INSTAGRAM_ACCESS_TOKEN")
+        }
+        missing_vars = [var_name for var_name, var_value in values.items() if not var_value]
+        if missing_vars:
+            raise ValueError(missing_vars)
+        return cls(*values.values())
+
+# Get credentials from environment variables / .env
+try:
+    CONFIG = GraphAppConfig.from_env()
+except ValueError as e:
     print("ERROR: Missing required environment variables:")
-    for var in missing_vars:
+    for var in e.args[0]:
         print(f"  - {var}")
     print("\nPlease add these to your .env file")
     exit(1)
 
-def check_current_permissions():
+# Permissions the current token must already have for posting to work
+REQUIRED_TOKEN_PERMISSIONS = frozenset({
+    'pages_read_engagement',
+    'pages_show_list',
+    'instagram_basic',
+    'instagram_content_publish',
+    'business_management'
+})
+
+# Permissions to request for a new token (Instagram Graph API), and the OAuth URL built from them
+OAUTH_PERMISSIONS = (
+    'pages_read_engagement',
+    'pages_show_list',
+    'pages_manage_posts',
+    'instagram_basic',
+    'instagram_content_publish',
+    'business_management'
+)
+OAUTH_SCOPE = ','.join(OAUTH_PERMISSIONS)
+OAUTH_REDIRECT_URI = 'https://localhost/'
+OAUTH_AUTH_URL = (
+    f"https://www.facebook.com/v18.0/dialog/oauth?"
+    f"client_id={CONFIG.app_id}&"
+    f"redirect_uri={OAUTH_REDIRECT_URI}&"
+    f"scope={OAUTH_SCOPE}&"
+    f"response_type=code"
+)
+
+def check_current_permissions(verbose=False):
     """Check what permissions the current token has."""
     print("🔍 Checking current token permissions...")
     
     url = "https://graph.facebook.com/v18.0/me/permissions"
-    params = {"access_token": CURRENT_TOKEN}
+    params = {"access_token": CONFIG.access_token}
     
     try:
-        response = requests.get(url, params=params)
+        response = graph_session.get(url, params=params)
         response.raise_for_status()
         data = response.json()
         
-        granted_permissions = []
-        declined_permissions = []
-        
-        for perm in data.get('data', []):
-            if perm.get('status') == 'granted':
-                granted_permissions.append(perm.get('permission'))
-            else:
-                declined_permissions.append(perm.get('permission'))
+        granted_permissions = {perm.get('permission') for perm in data.get('data', []) if perm.get('status') == 'granted'}
         
-        print(f"✅ Granted permissions: {', '.join(granted_permissions)}")
-        if declined_permissions:
-            print(f"❌ Declined permissions: {', '.join(declined_permissions)}")
+        if verbose:
+            declined_permissions = [perm.get('permission') for perm in data.get('data', []) if perm.get('status') != 'granted']
+            print(f"✅ Granted permissions: {', '.join(sorted(granted_permissions))}")
+            if declined_permissions:
+                print(f"❌ Declined permissions: {', '.join(declined_permissions)}")
         
         # Check for required permissions
-        required_perms = [
-            'pages_read_engagement',
-            'pages_show_list', 
-            'instagram_basic',
-            'instagram_content_publish',
-            'business_management'
-        ]
-        
-        missing_perms = [p for p in required_perms if p not in granted_permissions]
-        
-        if missing_perms:
+        if not REQUIRED_TOKEN_PERMISSIONS.issubset(granted_permissions):
+            missing_perms = sorted(REQUIRED_TOKEN_PERMISSIONS - granted_permissions)
             print(f"⚠️ Missing required permissions: {', '.join(missing_perms)}")
             return False, missing_perms
-        else:
-            print("✅ All required permissions granted!")
-            return True, []
+        
+        print("✅ All required permissions granted!")
+        return True, []
             
     except requests.exceptions.RequestException as e:
         print(f"❌ Error checking permissions: {e}")
@@ -81,31 +147,11 @@ def check_current_permissions():
 
 def generate_auth_url():
     """Generate Facebook OAuth URL with required permissions."""
-    
-    # Required permissions for Instagram Graph API
-    required_permissions = [
-        'pages_read_engagement',
-        'pages_show_list',
-        'pages_manage_posts',
-        'instagram_basic', 
-        'instagram_content_publish',
-        'business_management'
-    ]
-    
-    scope = ','.join(required_permissions)
-    redirect_uri = 'https://localhost/'
-    
-    auth_url = (
-        f"https://www.facebook.com/v18.0/dialog/oauth?"
-        f"client_id={APP_ID}&"
-        f"redirect_uri={redirect_uri}&"
-        f"scope={scope}&"
-        f"response_type=code"
-    )
+    auth_url = OAUTH_AUTH_URL
     
     print("🔗 Opening Facebook OAuth authorization...")
     print("📋 Required permissions:")
-    for perm in required_permissions:
+    for perm in OAUTH_PERMISSIONS:
         print(f"   • {perm}")
     
     print(f"\n🌐 Authorization URL: {auth_url}")
@@ -134,16 +180,7 @@ def use_graph_api_explorer():
     print("2. Click 'User Token' → 'Get User Access Token'")
     print("3. Add these permissions:")
     
-    permissions = [
-        "pages_read_engagement",
-        "pages_show_list", 
-        "pages_manage_posts",
-        "instagram_basic",
-        "instagram_content_publish",
-        "business_management"
-    ]
-    
-    for i, perm in enumerate(permissions, 1):
+    for i, perm in enumerate(OAUTH_PERMISSIONS, 1):
         print(f"   {i}. ✅ {perm}")
     
     print("\n4. Click 'Generate Access Token'")
@@ -171,28 +208,15 @@ def test_new_token():
     
     # Test the new token
     try:
-        # Test basic connectivity
+        # Test basic connectivity and pages access in a single batched round trip
         print("🔍 Testing new token...")
-        url = "https://graph.facebook.com/v18.0/me"
-        params = {"access_token": new_token}
-        
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        user_data = response.json()
+        user_data, pages_data = graph_batch(new_token, [
+            "me?fields=name",
+            "me/accounts?fields=name,id,instagram_business_account"
+        ])
         
         print(f"✅ Token valid for user: {user_data.get('name')}")
         
-        # Test pages access
-        url = "https://graph.facebook.com/v18.0/me/accounts"
-        params = {
-            "access_token": new_token,
-            "fields": "name,id,instagram_business_account"
-        }
-        
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        pages_data = response.json()
-        
         pages = pages_data.get('data', [])
         print(f"✅ Found {len(pages)} page(s)")
         
@@ -213,14 +237,13 @@ def test_new_token():
                     "instagram_user_id": instagram_id,
                     "page_id": page.get('id'),
                     "page_name": page_name,
-                    "app_id": APP_ID,
-                    "app_secret": APP_SECRET,
+                    "app_id": CONFIG.app_id,
+                    "app_secret": CONFIG.app_secret,
                     "api_version": "v18.0",
                     "status": "ready_for_automation"
                 }
                 
-                with open("instagram_config_fixed.json", "w") as f:
-                    json.dump(config, f, indent=2)
+                write_json("instagram_config_fixed.json", config)
                 
                 print(f"💾 Configuration saved to: instagram_config_fixed.json")
             else:
@@ -240,8 +263,14 @@ def main():
     print("🔧 Instagram Access Token Permission Fixer")
     print("=" * 60)
     
-    # Check current permissions
-    has_perms, missing = check_current_permissions()
+    # Check current permissions while the pages probe (only shown if permissions are OK) runs alongside
+    pages_params = {
+        "access_token": CONFIG.access_token,
+        "fields": "name,id,instagram_business_account,access_token"
+    }
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pages_future = executor.submit(graph_session.get, "https://graph.facebook.com/v18.0/me/accounts", params=pages_params, timeout=10)
+        has_perms, missing = check_current_permissions(verbose="--verbose" in sys.argv)
     
     if has_perms:
         print("\n✅ Current token has all required permissions!")
@@ -249,13 +278,7 @@ def main():
         
         # Test pages access with current token
         try:
-            url = "https://graph.facebook.com/v18.0/me/accounts"
-            params = {
-                "access_token": CURRENT_TOKEN,
-                "fields": "name,id,instagram_business_account,access_token"
-            }
-            
-            response = requests.get(url, params=params)
+            response = pages_future.result()
             print(f"\nPages API Response Status: {response.status_code}")
             print(f"Response: {response.text[:500]}...")
             
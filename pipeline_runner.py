@@ -0,0 +1,505 @@
+"""
+Shared orchestration for the run_pipeline*.py runners.
+Each runner describes its steps as data and hands them to Pipeline; starting/probing the API server,
+running steps, logging and the final summary live here once.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextlib
+import io
+import subprocess
+import sys
+import time
+import os
+import importlib.util
+import re
+import socket
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from _utf8_bootstrap import configure_utf8
+
+API_STARTUP_TIMEOUT = 15  # Max seconds to wait for the API server to accept connections
+MAX_PARALLEL_STEPS = 4  # Independent steps that may run at the same time
+
+EMOJI_REPLACEMENTS = {
+    '🔥': '[FIRE]', '🎭': '[THEATER]', '👗': '[DRESS]', '✅': '[OK]',
+    '❌': '[ERROR]', '⚠️': '[WARN]', '🚀': '[ROCKET]', '📝': '[MEMO]',
+    '📊': '[CHART]', '🎬': '[MOVIE]', '🖼️': '[IMAGE]', '💃': '[DANCER]',
+    '🟢': '[GREEN]', '🎉': '[PARTY]', '📤': '[UPLOAD]', '🛑': '[STOP]',
+    '⏰': '[CLOCK]', '⏱️': '[TIMER]', '🛡️': '[SHIELD]', '🔍': '[SEARCH]',
+    '🎨': '[ART]', '🔄': '[SYNC]', '⚡': '[FAST]', '🎪': '[CIRCUS]',
+    '💪': '[MUSCLE]', '🏋️': '[WEIGHT]', '🏃': '[RUN]', '🥇': '[GOLD]',
+    '🔤': '[TEXT]', '🧹': '[CLEAN]', '⏹️': '[STOP]', '📋': '[CLIPBOARD]'
+}
+# One regex pass per message instead of a str.replace per emoji (longest first so multi-codepoint emoji win)
+EMOJI_PATTERN = re.compile("|".join(map(re.escape, sorted(EMOJI_REPLACEMENTS, key=len, reverse=True))))
+# A line of step output and what ended it: a newline, or a lone \r from a progress redraw
+OUTPUT_SEGMENT = re.compile(rb'([^\r\n]*)(\r\n|\n|\r)')
+
+def safe_log_message(message):
+    """Sanitize Unicode characters for safe logging."""
+    if isinstance(message, str):
+        return EMOJI_PATTERN.sub(lambda m: EMOJI_REPLACEMENTS[m.group(0)], message)
+    return str(message)
+
+def run_script_in_process(script_path: Path) -> int:
+    """Import a step script and call its main(); returns an exit code like the subprocess would."""
+    spec = importlib.util.spec_from_file_location(f"pipeline_step_{script_path.stem}", script_path)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+        module.main()
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code)
+        return 1
+    return 0
+
+def wait_for_port(port: int, proc: subprocess.Popen, timeout: float = API_STARTUP_TIMEOUT) -> bool:
+    """Poll until the server accepts TCP connections on localhost:port; False on timeout or if proc exits."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            return False
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+class StepOutput(io.TextIOBase):
+    """Stand-in stdout for an in-process step: each complete line goes through Pipeline.echo()."""
+
+    def __init__(self, pipeline: "Pipeline", name: str):
+        super().__init__()
+        self.pipeline = pipeline
+        self.name = name
+        self.pending = ""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self.pending += text
+        *lines, self.pending = self.pending.split("\n")
+        for line in lines:
+            self.pipeline.echo(self.name, line.rsplit("\r", 1)[-1])
+        return len(text)
+
+    def finish(self):
+        if self.pending:
+            self.write("\n")
+
+@dataclass(frozen=True)
+class Step:
+    """One pipeline step; it starts once every step named in `after` has finished."""
+    script: Path
+    name: str
+    required: bool = True
+    in_process: bool = False  # light scripts with a main() are imported instead of spawned (only while no other step runs)
+    failure_note: str | None = None  # extra warning logged when an optional step fails
+    after: tuple | None = None  # step names it depends on; None means the step listed before it
+
+class Pipeline:
+    def __init__(self, title: str, api_server: Path, port: int, steps: list, log_file: Path, banner: tuple = ()):
+        self.title = title
+        self.api_server = api_server
+        self.port = port
+        self.steps = steps
+        self.banner = banner
+        self.start_time = datetime.now()
+        self.api_proc = None
+        self.completed_steps = []
+        self.failed_steps = []
+        self.active_steps = 0  # steps currently running; output is only tagged while more than one is
+        self.steps_lock = threading.Lock()  # run_step may be called from worker threads
+        self.log_lock = threading.Lock()
+        self.console = sys.stdout  # log()/echo() keep writing here while an in-process step's stdout is captured
+        # One block-buffered handle for the whole run instead of open/append/close per message;
+        # errors are flushed immediately and the rest on close (registered at exit as a backstop)
+        try:
+            self.log_file = open(log_file, "a", encoding="utf-8")
+            atexit.register(self.close)
+        except OSError:
+            self.log_file = None
+
+    def log(self, message: str, level: str = "INFO"):
+        """Log message to both console and file with Unicode safety."""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        safe_message = safe_log_message(message)
+        log_entry = f"[{timestamp}] [{level}] {safe_message}"
+
+        # Steps log from worker threads; the lock keeps their lines from interleaving
+        with self.log_lock:
+            print(log_entry, file=self.console)
+            if self.log_file is None:
+                return
+            try:
+                self.log_file.write(log_entry + "\n")
+                if level in ("ERROR", "FATAL"):
+                    self.log_file.flush()
+            except Exception:
+                pass  # Don't fail pipeline due to logging issues
+
+    def echo(self, source: str, line: str, redraw: bool = False):
+        """Forward one line of a step's output to the console and the log file.
+
+        The line is tagged with the step name while other steps are running too. A redraw (a line that
+        ended in a bare \r, i.e. a progress bar update) only goes to the console.
+        """
+        entry = f"[{source}] {line}" if self.active_steps > 1 else line
+        with self.log_lock:
+            if redraw:
+                self.console.write(entry + "\r")
+                self.console.flush()
+                return
+            print(entry, file=self.console)
+            if self.log_file is not None:
+                try:
+                    self.log_file.write(entry + "\n")
+                except Exception:
+                    pass
+
+    def forward_output(self, step: Step, proc: subprocess.Popen):
+        """Stream a step's stdout as it arrives, split on both \n and \r so progress redraws stay live."""
+        out_fd = proc.stdout.fileno()
+        pending = b""
+        while chunk := os.read(out_fd, 65536):
+            pending += chunk
+            end = 0
+            for match in OUTPUT_SEGMENT.finditer(pending):
+                if match.end() == len(pending) and match.group(2) == b"\r":
+                    break  # may be the first half of a \r\n split across reads
+                end = match.end()
+                redraw = match.group(2) == b"\r"
+                if redraw and not match.group(1):
+                    continue  # the \r that starts a redraw
+                self.echo(step.name, match.group(1).decode('utf-8', 'replace'), redraw=redraw)
+            pending = pending[end:]
+        if pending.strip(b"\r\n"):
+            self.echo(step.name, pending.strip(b"\r\n").decode('utf-8', 'replace'))
+
+    def close(self):
+        """Close the log file once the run (and its summary) is finished."""
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
+
+    def dependencies(self) -> dict:
+        """Map each step name to the names it waits for; names not in this pipeline are ignored."""
+        names = [step.name for step in self.steps]
+        deps = {}
+        for index, step in enumerate(self.steps):
+            if step.after is None:
+                deps[step.name] = {names[index - 1]} if index else set()
+            else:
+                deps[step.name] = {name for name in step.after if name in names}
+        return deps
+
+    def run_step(self, step: Step) -> bool:
+        """Run a pipeline step with Unicode-safe subprocess handling."""
+        if not step.script.exists():
+            self.log(f"[ERROR] MISSING SCRIPT: {step.script}", "ERROR")
+            if step.required:
+                self.log("[STOP] Pipeline stopped - required script missing", "FATAL")
+                return False
+            else:
+                self.log(f"[WARN] Skipping optional step: {step.name}", "WARN")
+                return True
+
+        cmd = [sys.executable, str(step.script)]
+        self.log(f"[ROCKET] Starting Step: {step.name}")
+        if step.in_process:
+            self.log(f"   Running in-process: {step.script.name}")
+        else:
+            self.log(f"   Command: {' '.join(cmd)}")
+
+        with self.steps_lock:
+            self.active_steps += 1
+        try:
+            if step.in_process:
+                # Runs on the calling thread with nothing else in flight (see run_steps); its prints are
+                # routed through echo() so they also reach the pipeline log
+                output = StepOutput(self, step.name)
+                with contextlib.redirect_stdout(output):
+                    try:
+                        returncode = run_script_in_process(step.script)
+                    finally:
+                        output.finish()
+                if returncode:
+                    raise subprocess.CalledProcessError(returncode, cmd)
+            else:
+                # stdout is forwarded line by line (tagged while steps overlap, and copied to the pipeline
+                # log); stderr, where tqdm draws its bars, goes straight to the console
+                with subprocess.Popen(cmd, stdout=subprocess.PIPE) as proc:
+                    self.forward_output(step, proc)
+                if proc.returncode:
+                    raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+            self.log(f"[OK] COMPLETED: {step.name}")
+            with self.steps_lock:
+                self.completed_steps.append(step.name)
+            return True
+
+        except subprocess.CalledProcessError as e:
+            self.log(f"[ERROR] FAILED: {step.name}", "ERROR")
+            self.log(f"   Exit code: {e.returncode}", "ERROR")
+
+            with self.steps_lock:
+                self.failed_steps.append(step.name)
+
+            if step.required:
+                self.log("[STOP] Pipeline stopped due to required step failure", "FATAL")
+                return False
+            else:
+                self.log(step.failure_note or "[WARN] Continuing despite optional step failure", "WARN")
+                return True
+
+        except Exception as e:
+            self.log(f"[ERROR] UNEXPECTED ERROR in {step.name}: {e}", "ERROR")
+            with self.steps_lock:
+                self.failed_steps.append(step.name)
+            return not step.required
+
+        finally:
+            with self.steps_lock:
+                self.active_steps -= 1
+
+    def start_api_server(self) -> bool:
+        """Start the API server in background."""
+        if not self.api_server.exists():
+            self.log(f"[ERROR] FATAL: API server script not found: {self.api_server}", "FATAL")
+            return False
+
+        self.log("[ROCKET] Starting API server in background...")
+        try:
+            # The server inherits PYTHONUTF8 from _utf8_bootstrap
+            self.api_proc = subprocess.Popen([sys.executable, str(self.api_server)])
+            self.log(f"   API server PID: {self.api_proc.pid}")
+
+            # Continue as soon as the server is accepting connections
+            self.log("   Waiting for API server to initialize...")
+            if not wait_for_port(self.port, self.api_proc):
+                # Check if process is still running
+                if self.api_proc.poll() is not None:
+                    self.log("[ERROR] API server failed to start or crashed immediately", "ERROR")
+                    return False
+                self.log(f"[WARN] API server not listening on port {self.port} after {API_STARTUP_TIMEOUT}s, continuing", "WARN")
+
+            self.log("[OK] API server started successfully")
+            return True
+
+        except Exception as e:
+            self.log(f"[ERROR] Failed to start API server: {e}", "ERROR")
+            return False
+
+    def stop_api_server(self):
+        """Gracefully stop the API server."""
+        if self.api_proc:
+            self.log("[STOP] Stopping API server...")
+            try:
+                self.api_proc.terminate()
+                try:
+                    self.api_proc.wait(timeout=15)
+                    self.log("[OK] API server stopped gracefully")
+                except subprocess.TimeoutExpired:
+                    self.log("[WARN] API server timeout, force killing...")
+                    self.api_proc.kill()
+                    self.log("[OK] API server force stopped")
+            except Exception as e:
+                self.log(f"[WARN] Error stopping API server: {e}", "WARN")
+            self.api_proc = None
+
+    def run_steps(self) -> bool:
+        """Run the steps as a DAG: each is submitted as soon as its dependencies have finished.
+
+        A failed optional step still counts as finished; a failed required step stops new submissions.
+        A step's process has exited before its dependents start, so no settle delay is needed.
+        In-process steps share this interpreter, so one only starts once nothing else is running, and it
+        runs on this (main) thread where Ctrl-C can interrupt it.
+        """
+        deps = self.dependencies()
+        pending = list(self.steps)
+        finished = set()
+        ok = True
+        with ThreadPoolExecutor(max_workers=MAX_PARALLEL_STEPS) as executor:
+            running = {}
+            while pending or running:
+                if ok:
+                    ready = [s for s in pending if deps[s.name] <= finished]
+                    for step in ready:
+                        if not step.in_process:
+                            pending.remove(step)
+                            running[executor.submit(self.run_step, step)] = step
+                    if not running and ready:
+                        step = ready[0]  # only in-process steps are left ready
+                        pending.remove(step)
+                        if self.run_step(step):
+                            finished.add(step.name)
+                        else:
+                            ok = False
+                        continue
+                if not running:
+                    break  # stopped after a failure, or the remaining dependencies can never be met
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    if future.result():
+                        finished.add(step.name)
+                    else:
+                        ok = False
+        return ok and not pending
+
+    def run(self, api_started=None) -> bool:
+        """Start the API server (unless already started), run the steps and stop the server.
+
+        api_started is the result of a start_api_server() call already made in the background;
+        the server is started here when it is None.
+        """
+        self.log("=" * 80)
+        self.log(f"[MOVIE] STARTING {self.title.upper()}")
+        for line in self.banner:
+            self.log(line)
+        self.log("=" * 80)
+
+        # Step 0: Start API Server
+        if api_started is None:
+            api_started = self.start_api_server()
+        if not api_started:
+            return False
+
+        try:
+            return self.run_steps()
+
+        finally:
+            self.stop_api_server()
+
+    def print_final_summary(self):
+        """Print a comprehensive summary of the pipeline run."""
+        end_time = datetime.now()
+        duration = end_time - self.start_time
+        title = self.title.upper()
+
+        self.log("=" * 80)
+        self.log(f"[CHART] {title} EXECUTION SUMMARY")
+        self.log("=" * 80)
+        self.log(f"[CLOCK] Start Time: {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+        self.log(f"[CLOCK] End Time: {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
+        self.log(f"[TIMER] Total Duration: {str(duration).split('.')[0]}")
+        self.log("")
+
+        self.log(f"[OK] Completed Steps ({len(self.completed_steps)}):")
+        for step in self.completed_steps:
+            self.log(f"   [OK] {step}")
+
+        if self.failed_steps:
+            self.log(f"[ERROR] Failed Steps ({len(self.failed_steps)}):")
+            for step in self.failed_steps:
+                self.log(f"   [ERROR] {step}")
+
+        self.log("")
+        core_steps = {step.name for step in self.steps if step.required}
+        if len(self.failed_steps) == 0:
+            self.log(f"[PARTY] {title} COMPLETED SUCCESSFULLY!")
+            self.log("   All content generated and ready!")
+        elif core_steps <= set(self.completed_steps):  # All required steps completed
+            self.log(f"[WARN] {title} PARTIALLY COMPLETED")
+            self.log("   Core content generated but some final steps failed")
+        else:
+            self.log(f"[ERROR] {title} FAILED")
+            self.log("   Critical steps failed - check logs for details")
+
+        self.log("=" * 80)
+
+    def check_required_scripts(self) -> bool:
+        """Check if the API server and every step script exist."""
+        missing_required = []
+        missing_optional = []
+        scripts = [(self.api_server, "API Server", True)] + [(step.script, step.name, step.required) for step in self.steps]
+
+        # One directory listing per folder (normally just the repo root) instead of a stat per script
+        present = {}
+        for directory in {script_path.parent for script_path, _, _ in scripts}:
+            try:
+                with os.scandir(directory) as entries:
+                    present[directory] = {entry.name for entry in entries if entry.is_file()}
+            except OSError:
+                present[directory] = set()
+
+        # The report is collected and written in one go rather than one console write per line
+        out = []
+        for script_path, name, required in scripts:
+            if script_path.name not in present[script_path.parent]:
+                if required:
+                    missing_required.append(f"[ERROR] {name}: {script_path}")
+                else:
+                    missing_optional.append(f"[WARN] {name}: {script_path}")
+            else:
+                out.append(f"[OK] {name}: Found")
+
+        if missing_required:
+            out.append("\n[STOP] MISSING REQUIRED SCRIPTS:")
+            out.extend(f"   {missing}" for missing in missing_required)
+            out.append(f"\n[MEMO] {self.title} cannot run without these scripts!")
+        elif missing_optional:
+            out.append("\n[WARN] MISSING OPTIONAL SCRIPTS:")
+            out.extend(f"   {missing}" for missing in missing_optional)
+            out.append("   Pipeline will run but some features will be skipped")
+
+        self.print_block(out)
+        return not missing_required
+
+    def print_block(self, lines) -> None:
+        """Write several console lines at once, without interleaving with concurrent log() output."""
+        with self.log_lock:
+            print("\n".join(lines))
+
+    def main(self, config_lines: tuple = (), confirm: bool = True) -> None:
+        """Check scripts, optionally ask for confirmation, run the pipeline and exit with its status."""
+        configure_utf8()  # UTF-8 console + PYTHONUTF8 for child processes
+        # Step output is read through a pipe (see run_step); unbuffered children keep it live instead of in 8 KB bursts
+        os.environ.setdefault("PYTHONUNBUFFERED", "1")
+
+        # Bring the API server up in the background while scripts are checked and the run is confirmed
+        api_future = None
+        if self.api_server.exists():
+            executor = ThreadPoolExecutor(max_workers=1)
+            api_future = executor.submit(self.start_api_server)
+            executor.shutdown(wait=False)
+
+        def abort(code):
+            if api_future is not None:
+                api_future.result()
+            self.stop_api_server()
+            self.close()
+            sys.exit(code)
+
+        self.print_block([f"[SEARCH] Checking {self.title.lower()} scripts..."])
+        if not self.check_required_scripts():
+            print("\n[ERROR] Please ensure all required scripts are present")
+            abort(1)
+
+        self.print_block([f"\n[GEAR] {self.title} Configuration:"] + [f"   {line}" for line in config_lines])
+
+        if confirm:
+            response = input(f"\n[ROCKET] Ready to start {self.title.lower()}? (y/N): ").lower().strip()
+            if response not in ['y', 'yes']:
+                print(f"{self.title} cancelled by user")
+                abort(0)
+
+        try:
+            success = self.run(api_future.result())
+            self.print_final_summary()
+        finally:
+            self.close()
+
+        # Exit with appropriate code
+        sys.exit(0 if success else 1)
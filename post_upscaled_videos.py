@@ -3,50 +3,282 @@
 Unified Social Media Video Poster
 Automatically posts upscaled videos to Facebook and Instagram after upscale_4k_parallel.py completes.
 Monitors the upscale output directory and posts new videos to both platforms.
+Run with --watch to keep running and post new videos as soon as they are written (requires watchdog).
 """
 
 import os
 import sys
 import json
+import mmap
+import shutil
+import hashlib
+import subprocess
 import time
-import requests
+import queue
+import random
+import threading
 from pathlib import Path
-from dotenv import load_dotenv
 from datetime import datetime
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 from instagrapi import Client
 from instagrapi.exceptions import LoginRequired
+from urllib3.util.retry import Retry
 
-# Load environment variables
-load_dotenv()
+import env_cache
+import http_utils
+
+# watchdog is optional; only needed for --watch mode
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+# requests-toolbelt is optional; it streams multipart uploads instead of building the body in memory
+try:
+    from requests_toolbelt import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None
 
 # === CONFIGURATION ===
 # Directory settings (matches upscale_4k_parallel.py)
 COMFYUI_OUTPUT_DIR_BASE = Path(r"H:\dancers_content")
 UPSCALE_SUBFOLDER = "4k_upscaled"
 COMPILED_SUBFOLDER = "compiled"
+UPSCALED_SUFFIX = "_upscaled.mp4"  # Naming used by upscale_4k_parallel.py for finished videos
 
 # Social media credentials
-INSTA_USERNAME = os.getenv("INSTA_USERNAME")
-INSTA_PASSWORD = os.getenv("INSTA_PASSWORD")
-INSTAGRAM_ACCESS_TOKEN = os.getenv("INSTAGRAM_ACCESS_TOKEN")
-INSTAGRAM_USER_ID = os.getenv("INSTAGRAM_USER_ID")
-FACEBOOK_PAGE_ACCESS_TOKEN = os.getenv("FACEBOOK_PAGE_ACCESS_TOKEN")
-FACEBOOK_PAGE_ID = os.getenv("FACEBOOK_PAGE_ID")
+INSTA_USERNAME = env_cache.get("INSTA_USERNAME")
+INSTA_PASSWORD = env_cache.get("INSTA_PASSWORD")
+INSTAGRAM_ACCESS_TOKEN = env_cache.get("INSTAGRAM_ACCESS_TOKEN")
+INSTAGRAM_USER_ID = env_cache.get("INSTAGRAM_USER_ID")
+FACEBOOK_PAGE_ACCESS_TOKEN = env_cache.get("FACEBOOK_PAGE_ACCESS_TOKEN")
+FACEBOOK_PAGE_ID = env_cache.get("FACEBOOK_PAGE_ID")
 
 # Upload settings
-DELAY_BETWEEN_PLATFORMS = 60  # 1 minute between Instagram and Facebook
-DELAY_BETWEEN_VIDEOS = 300   # 5 minutes between different videos
-POSTED_LOG_FILE = Path("posted_videos_unified.json")
+PLATFORM_START_JITTER = 5  # Max random delay before the Instagram upload so both platforms don't hit Meta at the same instant
+DELAY_BETWEEN_VIDEOS = 300   # Average spacing (seconds) between uploads to the same platform
+UPLOAD_BURST = 2  # Uploads a platform may start back to back before DELAY_BETWEEN_VIDEOS spacing applies
+UPLOAD_WORKERS = 2  # Videos uploaded concurrently
+MAX_CONCURRENT_UPLOADS = 3  # Video bodies in flight at once across all workers and platforms
+POSTED_LOG_FILE = Path("posted_videos_unified.jsonl")  # Append-only, one JSON record per line
+POSTED_INDEX_FILE = Path("posted_videos_unified.posted_index")  # Filenames and fingerprints of successful posts, one per line
+LEGACY_POSTED_LOG_FILE = Path("posted_videos_unified.json")  # Old single-array log, migrated on first run
+FINGERPRINT_SAMPLE_BYTES = 1024 * 1024  # Bytes hashed from each end of a video for its content fingerprint
+PRESTAGE_CHUNK_BYTES = 1024 * 1024  # Read size when pre-staging a video without posix_fadvise (Windows)
+FFPROBE = shutil.which("ffprobe")  # Optional; only used to report resolution/duration
+WATCH_STABLE_SECONDS = 5  # File size must stay unchanged this long before a watched video is posted
+
+FACEBOOK_CHUNK_RETRIES = 3  # Retries per chunk of a resumable Facebook upload before giving up
+UPLOAD_CONNECT_TIMEOUT = 10  # (connect, read) timeouts: read is an idle timeout per socket read, not a total cap
 
 # Facebook Graph API
 GRAPH_API_VERSION = "v18.0"
 GRAPH_BASE_URL = f"https://graph.facebook.com/{GRAPH_API_VERSION}"
+GRAPH_BATCH_LIMIT = 50  # Max sub-requests per Graph batch call
+KEEPALIVE_INTERVAL = 45  # Seconds between keep-alive pings while uploads are active
+MIN_POLLING_INTERVAL = 1.0  # Container status polling starts here and backs off...
+POLLING_BACKOFF_FACTOR = 1.5
+MAX_POLLING_INTERVAL = 30  # ...up to this many seconds between checks
+# Keep-alive session for every Graph API call. GET/HEAD requests back off and retry on throttling (429) and 5xx;
+# POSTs (uploads, publishes, batch polls) only retry failed connects, since a file body is already consumed
+# and a replayed publish could double-post.
+GRAPH_SESSION = http_utils.create_session(
+    "https://graph.facebook.com",
+    retries=Retry(
+        total=3,
+        backoff_factor=2,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True
+    ),
+    pool_connections=4,
+    pool_maxsize=8
+)
+
+# Global cap on simultaneous upload bodies so concurrent workers don't split the uplink too thin
+UPLOAD_SLOTS = threading.BoundedSemaphore(MAX_CONCURRENT_UPLOADS)
+
+AUTH_RETRIES = 3  # Retries of a Graph call after picking up a new token for an expired/invalidated one
+MAX_TOKEN_REFRESH_FAILURES = 3  # Consecutive failed refreshes before we stop trying (circuit breaker)
+TOKEN_LOCK = threading.Lock()  # One refresh at a time; other workers wait for it and reuse the result
+token_refresh_failures = 0
+
+def is_auth_error(response) -> bool:
+    """True only for an expired or invalidated access token (Graph error code 190).
+
+    Permission errors (codes 10/200, returned as 403 on a valid token) are not auth errors:
+    a new token would carry the same permissions, so retrying can't help.
+    """
+    if response.ok:
+        return False
+    try:
+        return response.json().get('error', {}).get('code') == 190
+    except (ValueError, AttributeError):
+        return False
+
+def refresh_graph_tokens(stale_tokens: tuple) -> bool:
+    """Pick up new Graph tokens from .env after an auth failure. Returns True if the caller should retry.
+
+    A rejected token can't be exchanged for a new one (Graph refuses to exchange an expired token),
+    so the only way to recover mid-run is a fresh token pasted into .env.
+    """
+    global INSTAGRAM_ACCESS_TOKEN, FACEBOOK_PAGE_ACCESS_TOKEN, token_refresh_failures
+    with TOKEN_LOCK:
+        if (INSTAGRAM_ACCESS_TOKEN, FACEBOOK_PAGE_ACCESS_TOKEN) != stale_tokens:
+            return True  # Another worker refreshed while we waited for the lock
+        if token_refresh_failures >= MAX_TOKEN_REFRESH_FAILURES:
+            return False
+        
+        try:
+            # A long-running --watch process picks up tokens pasted into .env
+            instagram_token = env_cache.get("INSTAGRAM_ACCESS_TOKEN")
+            facebook_token = env_cache.get("FACEBOOK_PAGE_ACCESS_TOKEN")
+            
+            if (instagram_token, facebook_token) == stale_tokens:
+                raise RuntimeError("no new token in .env")
+        except Exception as e:
+            token_refresh_failures += 1
+            print(f"⚠️ Graph token refresh failed ({token_refresh_failures}/{MAX_TOKEN_REFRESH_FAILURES}): {e}")
+            return False
+        
+        INSTAGRAM_ACCESS_TOKEN, FACEBOOK_PAGE_ACCESS_TOKEN = instagram_token, facebook_token
+        token_refresh_failures = 0
+        print("🔑 Graph API tokens refreshed")
+        return True
+
+def graph_call(send):
+    """Run send() (which reads the current token globals) and retry it after refreshing tokens on auth errors."""
+    for attempt in range(AUTH_RETRIES + 1):
+        used_tokens = (INSTAGRAM_ACCESS_TOKEN, FACEBOOK_PAGE_ACCESS_TOKEN)
+        response = send()
+        if attempt == AUTH_RETRIES or not is_auth_error(response) or not refresh_graph_tokens(used_tokens):
+            break
+        time.sleep(2 ** attempt)
+    response.raise_for_status()
+    return response
+
+def post_video_multipart(url: str, data: dict, field: str, video_path: Path, read_timeout: int):
+    """POST a video as multipart/form-data, streaming it from disk when requests-toolbelt is installed."""
+    timeout = (UPLOAD_CONNECT_TIMEOUT, read_timeout)
+    # Both paths take the open file object: the encoder needs a readable stream whose remaining
+    # length shrinks as it is read, and the (name, file, type) tuple keeps the .mp4 filename
+    with UPLOAD_SLOTS, open(video_path, 'rb') as f:
+        video_part = (video_path.name, f, 'video/mp4')
+        if MultipartEncoder is None:
+            return GRAPH_SESSION.post(url, files={field: video_part}, data=data, timeout=timeout)
+        encoder = MultipartEncoder(fields={**data, field: video_part})
+        return GRAPH_SESSION.post(url, data=encoder, headers={'Content-Type': encoder.content_type}, timeout=timeout)
+
+@dataclass(frozen=True)
+class VideoProbe:
+    """Per-video metadata gathered once and shared by every platform upload."""
+    path: Path
+    size: int
+    fingerprint: str
+    duration: float = 0.0
+    width: int = 0
+    height: int = 0
+    
+    @classmethod
+    def from_path(cls, video_path: Path):
+        size = video_path.stat().st_size
+        # Hash the head and tail plus the size: cheap, and enough to spot a re-exported copy under a new name
+        digest = hashlib.sha1(str(size).encode())
+        with open(video_path, 'rb') as f:
+            digest.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+            if size > FINGERPRINT_SAMPLE_BYTES:
+                f.seek(max(FINGERPRINT_SAMPLE_BYTES, size - FINGERPRINT_SAMPLE_BYTES))
+                digest.update(f.read())
+        
+        duration, width, height = 0.0, 0, 0
+        if FFPROBE:
+            try:
+                res = subprocess.run(
+                    [FFPROBE, "-v", "quiet", "-print_format", "json", "-show_streams", "-select_streams", "v:0", str(video_path)],
+                    capture_output=True, text=True, timeout=30
+                )
+                stream = json.loads(res.stdout)["streams"][0]
+                duration = float(stream.get("duration", 0))
+                width, height = int(stream.get("width", 0)), int(stream.get("height", 0))
+            except Exception:
+                pass
+        
+        return cls(video_path, size, f"sha1:{digest.hexdigest()}", duration, width, height)
+
+class TokenBucket:
+    """Per-platform rate limiter: allows `capacity` uploads at once, refilling one every `refill_seconds`."""
+    
+    def __init__(self, capacity: int, refill_seconds: float):
+        self.capacity = capacity
+        self.refill_seconds = refill_seconds
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until an upload slot is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) / self.refill_seconds)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) * self.refill_seconds
+            time.sleep(wait)
+    
+    def wait_time(self) -> float:
+        """Seconds until acquire() would return, without taking a token."""
+        with self.lock:
+            tokens = min(self.capacity, self.tokens + (time.monotonic() - self.updated) / self.refill_seconds)
+            return max(0.0, (1 - tokens) * self.refill_seconds)
+
+def prestage_video(video_path: Path):
+    """Pull a video into the OS page cache while its upload waits on a rate limit, so it starts from memory."""
+    try:
+        with open(video_path, 'rb') as f:
+            if hasattr(os, 'posix_fadvise'):
+                # The kernel reads it ahead in the background
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+            else:
+                while f.read(PRESTAGE_CHUNK_BYTES):
+                    pass
+    except OSError:
+        pass  # Only an optimisation; the upload reads the file itself
 
 class SocialMediaPoster:
     def __init__(self):
         self.instagram_client = None
+        self.settings_hash = None  # Digest of the instagrapi settings last loaded from / written to disk
+        # instagrapi's Client is not thread-safe, so Basic uploads from concurrent workers take turns
+        self.instagram_lock = threading.Lock()
+        self.instagram_bucket = TokenBucket(UPLOAD_BURST, DELAY_BETWEEN_VIDEOS)
+        self.facebook_bucket = TokenBucket(UPLOAD_BURST, DELAY_BETWEEN_VIDEOS)
+        self.active_uploads = 0
+        self.active_lock = threading.Lock()
+        self.keepalive_thread = None
         self.validate_credentials()
     
+    def _keepalive(self):
+        """Ping the Graph API while uploads are in progress so pooled connections don't go cold between calls."""
+        while True:
+            time.sleep(KEEPALIVE_INTERVAL)
+            if self.active_uploads == 0:
+                continue
+            try:
+                GRAPH_SESSION.head(GRAPH_BASE_URL, timeout=5)
+            except Exception:
+                pass
+    
+    def _start_keepalive(self):
+        if self.keepalive_thread is None and (self.use_instagram_graph or self.use_facebook):
+            self.keepalive_thread = threading.Thread(target=self._keepalive, daemon=True)
+            self.keepalive_thread.start()
+    
     def validate_credentials(self):
         """Validate all required credentials."""
         required_instagram = [INSTA_USERNAME, INSTA_PASSWORD]
@@ -81,12 +313,25 @@ class SocialMediaPoster:
         try:
             if session_file.exists():
                 self.instagram_client.load_settings(session_file)
+                self.settings_hash = self._settings_digest()
+                # Reuse the saved cookies/device if they are still valid: one request instead of a full login
+                try:
+                    self.instagram_client.get_timeline_feed()
+                    self._save_instagram_settings(session_file)
+                    print(f"✅ Instagram Basic: Reused saved session for {INSTA_USERNAME}")
+                    return True
+                except LoginRequired:
+                    print("⚠️ Instagram Basic: Saved session expired, logging in again...")
+                    old_settings = self.instagram_client.get_settings()
+                    self.instagram_client = Client()
+                    # Keep the same device identity so Instagram doesn't see a new device
+                    self.instagram_client.set_uuids(old_settings.get("uuids", {}))
             
             self.instagram_client.login(INSTA_USERNAME, INSTA_PASSWORD)
             if not self.instagram_client.user_id:
                 raise LoginRequired("Login check failed")
             
-            self.instagram_client.dump_settings(session_file)
+            self._save_instagram_settings(session_file)
             print(f"✅ Instagram Basic: Logged in as {self.instagram_client.username}")
             return True
             
@@ -94,35 +339,51 @@ class SocialMediaPoster:
             print(f"❌ Instagram Basic login failed: {e}")
             return False
     
-    def post_to_instagram_basic(self, video_path: Path, caption: str = "") -> bool:
+    def _settings_digest(self) -> bytes:
+        settings = json.dumps(self.instagram_client.get_settings(), sort_keys=True)
+        return hashlib.sha1(settings.encode()).digest()
+    
+    def _save_instagram_settings(self, session_file: Path):
+        """Write the instagrapi session file only if the settings changed, atomically."""
+        digest = self._settings_digest()
+        if digest == self.settings_hash:
+            return
+        # Write to a temp file and swap it in so a concurrent run never reads a half-written session
+        tmp_file = session_file.with_suffix(f'.{os.getpid()}.tmp')
+        self.instagram_client.dump_settings(tmp_file)
+        os.replace(tmp_file, session_file)
+        self.settings_hash = digest
+    
+    def post_to_instagram_basic(self, probe: VideoProbe, caption: str = "") -> bool:
         """Post video to Instagram using basic API."""
         if not self.use_instagram_basic or not self.instagram_client:
             return False
             
         try:
-            print(f"📤 Posting to Instagram (Basic): {video_path.name}")
-            self.instagram_client.clip_upload(path=video_path, caption=caption)
+            print(f"📤 Posting to Instagram (Basic): {probe.path.name}")
+            with self.instagram_lock:
+                self.instagram_client.clip_upload(path=probe.path, caption=caption)
             print("✅ Instagram Basic: Upload successful!")
             return True
         except Exception as e:
             print(f"❌ Instagram Basic upload failed: {e}")
             return False
     
-    def post_to_instagram_graph(self, video_path: Path, caption: str = "") -> bool:
+    def post_to_instagram_graph(self, probe: VideoProbe, caption: str = "") -> bool:
         """Post video to Instagram using Graph API."""
         if not self.use_instagram_graph:
             return False
             
         try:
-            print(f"📤 Posting to Instagram (Graph): {video_path.name}")
+            print(f"📤 Posting to Instagram (Graph): {probe.path.name}")
             
             # Create media container
-            container_id = self._create_instagram_container(video_path, caption)
+            container_id = self._create_instagram_container(probe, caption)
             if not container_id:
                 return False
             
             # Wait for processing
-            if not self._wait_for_instagram_processing(container_id):
+            if not self._wait_for_instagram_processing([container_id])[container_id]:
                 return False
             
             # Publish
@@ -136,94 +397,186 @@ class SocialMediaPoster:
         
         return False
     
-    def post_to_facebook(self, video_path: Path, caption: str = "") -> bool:
+    def post_to_facebook(self, probe: VideoProbe, caption: str = "") -> bool:
         """Post video to Facebook Page."""
         if not self.use_facebook:
             return False
             
+        self.facebook_bucket.acquire()
         try:
-            print(f"📤 Posting to Facebook: {video_path.name}")
+            print(f"📤 Posting to Facebook: {probe.path.name}")
             
             url = f"{GRAPH_BASE_URL}/{FACEBOOK_PAGE_ID}/videos"
             
-            with open(video_path, 'rb') as video_file:
-                files = {'file': video_file}
-                data = {
-                    'access_token': FACEBOOK_PAGE_ACCESS_TOKEN,
-                    'description': caption,
-                    'published': 'true'
-                }
-                
-                response = requests.post(url, files=files, data=data, timeout=600)
-                response.raise_for_status()
-                result = response.json()
+            # Resumable upload: start a session, send the file in server-sized chunks, then publish
+            response = graph_call(lambda: GRAPH_SESSION.post(url, data={
+                'access_token': FACEBOOK_PAGE_ACCESS_TOKEN,
+                'upload_phase': 'start',
+                'file_size': probe.size
+            }, timeout=(UPLOAD_CONNECT_TIMEOUT, 60)))
+            session = response.json()
+            video_id = session.get('video_id')
+            
+            self._transfer_facebook_chunks(url, probe.path, session)
+            
+            response = graph_call(lambda: GRAPH_SESSION.post(url, data={
+                'access_token': FACEBOOK_PAGE_ACCESS_TOKEN,
+                'upload_phase': 'finish',
+                'upload_session_id': session['upload_session_id'],
+                'description': caption,
+                'published': 'true'
+            }, timeout=(UPLOAD_CONNECT_TIMEOUT, 120)))
+            result = response.json()
+            
+            if result.get('success') and video_id:
+                print(f"✅ Facebook: Upload successful! Post ID: {video_id}")
+                return True
+            else:
+                print(f"❌ Facebook: Upload not finished: {result}")
+                return False
                 
-                if result.get('id'):
-                    print(f"✅ Facebook: Upload successful! Post ID: {result['id']}")
-                    return True
-                else:
-                    print(f"❌ Facebook: No post ID in response: {result}")
-                    return False
-                    
         except Exception as e:
             print(f"❌ Facebook upload failed: {e}")
             return False
     
-    def _create_instagram_container(self, video_path: Path, caption: str) -> str:
+    def _transfer_facebook_chunks(self, url: str, video_path: Path, session: dict):
+        """Send the chunks of a resumable upload, retrying only the chunk that failed."""
+        start_offset = int(session['start_offset'])
+        end_offset = int(session['end_offset'])
+        failures = 0
+        
+        # Chunks are zero-copy views into a read-only mapping of the file, so the only copy made is
+        # the one into the request body
+        with open(video_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            while start_offset < end_offset:
+                try:
+                    with UPLOAD_SLOTS, view[start_offset:end_offset] as chunk:
+                        response = graph_call(lambda: GRAPH_SESSION.post(url, data={
+                            'access_token': FACEBOOK_PAGE_ACCESS_TOKEN,
+                            'upload_phase': 'transfer',
+                            'upload_session_id': session['upload_session_id'],
+                            'start_offset': start_offset
+                        }, files={'video_file_chunk': (video_path.name, chunk)}, timeout=(UPLOAD_CONNECT_TIMEOUT, 120)))
+                except Exception as e:
+                    failures += 1
+                    if failures > FACEBOOK_CHUNK_RETRIES:
+                        raise
+                    print(f"⚠️ Facebook: Chunk at {start_offset} failed ({e}), retrying...")
+                    time.sleep(2 ** failures)
+                    continue
+                
+                failures = 0
+                # The server tells us which byte range to send next
+                offsets = response.json()
+                start_offset = int(offsets['start_offset'])
+                end_offset = int(offsets['end_offset'])
+    
+    def _create_instagram_container(self, probe: VideoProbe, caption: str) -> str:
         """Create Instagram media container."""
         url = f"{GRAPH_BASE_URL}/{INSTAGRAM_USER_ID}/media"
         
-        with open(video_path, 'rb') as video_file:
-            files = {'video': video_file}
-            data = {
+        data = {
+            'media_type': 'REELS',
+            'caption': caption
+        }
+        
+        response = graph_call(lambda: post_video_multipart(
+            url, {**data, 'access_token': INSTAGRAM_ACCESS_TOKEN}, 'video', probe.path, read_timeout=300
+        ))
+        result = response.json()
+        container_id = result.get('id')
+        if not container_id:
+            return None
+        
+        # Fatal problems (codec, aspect ratio, duration) are reported right away; don't wait them out
+        response = graph_call(lambda: GRAPH_SESSION.get(f"{GRAPH_BASE_URL}/{container_id}", params={
+            'access_token': INSTAGRAM_ACCESS_TOKEN,
+            'fields': 'status_code,status'
+        }, timeout=30))
+        preflight = response.json()
+        if preflight.get('status_code') == 'ERROR':
+            print(f"❌ Instagram Graph: Container rejected: {preflight.get('status')}")
+            return None
+        return container_id
+    
+    def _poll_instagram_containers(self, container_ids: list) -> dict:
+        """Fetch status_code for many containers in one round trip via the Graph batch endpoint."""
+        statuses = {}
+        for i in range(0, len(container_ids), GRAPH_BATCH_LIMIT):
+            chunk = container_ids[i:i + GRAPH_BATCH_LIMIT]
+            batch = [{"method": "GET", "relative_url": f"{cid}?fields=status_code"} for cid in chunk]
+            response = graph_call(lambda: GRAPH_SESSION.post(f"{GRAPH_BASE_URL}/", data={
                 'access_token': INSTAGRAM_ACCESS_TOKEN,
-                'media_type': 'REELS',
-                'caption': caption
-            }
+                'batch': json.dumps(batch)
+            }, timeout=30))
             
-            response = requests.post(url, files=files, data=data, timeout=300)
-            response.raise_for_status()
-            result = response.json()
-            return result.get('id')
+            for cid, item in zip(chunk, response.json()):
+                # A failed sub-request just leaves that container pending until the next tick
+                if item and item.get('code') == 200:
+                    statuses[cid] = http_utils.loads(item['body']).get('status_code')
+        return statuses
     
-    def _wait_for_instagram_processing(self, container_id: str, max_wait: int = 300) -> bool:
-        """Wait for Instagram video processing."""
-        url = f"{GRAPH_BASE_URL}/{container_id}"
-        params = {
-            'access_token': INSTAGRAM_ACCESS_TOKEN,
-            'fields': 'status_code'
-        }
+    def _wait_for_instagram_processing(self, container_ids: list, max_wait: int = 300) -> dict:
+        """Wait for Instagram video processing; returns {container_id: finished} for every container."""
+        finished = {cid: False for cid in container_ids}
+        pending = list(container_ids)
+        last_statuses = {}
+        delay = MIN_POLLING_INTERVAL
         
         start_time = time.time()
-        while time.time() - start_time < max_wait:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+        while pending and time.time() - start_time < max_wait:
+            statuses = self._poll_instagram_containers(pending)
+            for cid, status_code in statuses.items():
+                if status_code == 'FINISHED':
+                    finished[cid] = True
+                    pending.remove(cid)
+                elif status_code == 'ERROR':
+                    pending.remove(cid)
             
-            status_code = data.get('status_code')
-            if status_code == 'FINISHED':
-                return True
-            elif status_code == 'ERROR':
-                return False
+            if not pending:
+                break
             
-            time.sleep(10)
+            # Poll quickly right after something changes, then back off while nothing does
+            if statuses != last_statuses:
+                delay = MIN_POLLING_INTERVAL
+            else:
+                delay = min(MAX_POLLING_INTERVAL, delay * POLLING_BACKOFF_FACTOR)
+            last_statuses = statuses
+            
+            remaining = max_wait - (time.time() - start_time)
+            time.sleep(max(0, min(remaining, delay * random.uniform(0.8, 1.2))))
         
-        return False
+        return finished
     
     def _publish_instagram_media(self, container_id: str) -> str:
         """Publish Instagram media."""
         url = f"{GRAPH_BASE_URL}/{INSTAGRAM_USER_ID}/media_publish"
-        data = {
+        response = graph_call(lambda: GRAPH_SESSION.post(url, data={
             'access_token': INSTAGRAM_ACCESS_TOKEN,
             'creation_id': container_id
-        }
-        
-        response = requests.post(url, data=data)
-        response.raise_for_status()
+        }))
         result = response.json()
         return result.get('id')
     
-    def post_video_to_all_platforms(self, video_path: Path) -> dict:
+    def _post_instagram(self, probe: VideoProbe) -> dict:
+        """Post to Instagram (prefer Graph API, fall back to Basic) and return the per-path results."""
+        results = {}
+        if not (self.use_instagram_graph or self.use_instagram_basic):
+            return results
+        self.instagram_bucket.acquire()
+        time.sleep(random.uniform(0, PLATFORM_START_JITTER))
+        if self.use_instagram_graph:
+            results['instagram_graph'] = self.post_to_instagram_graph(probe)
+            if results['instagram_graph']:
+                return results
+            if self.instagram_client:
+                # Basic goes through a different backend, so a Graph outage doesn't lose the video
+                print("↪️ Instagram Graph failed, retrying via Instagram Basic")
+        if self.use_instagram_basic:
+            results['instagram_basic'] = self.post_to_instagram_basic(probe)
+        return results
+    
+    def post_video_to_all_platforms(self, probe: VideoProbe) -> dict:
         """Post video to all configured platforms."""
         results = {
             'instagram_basic': False,
@@ -231,47 +584,104 @@ class SocialMediaPoster:
             'facebook': False
         }
         
-        print(f"\n🎬 Processing: {video_path.name}")
+        print(f"\n🎬 Processing: {probe.path.name}")
+        if probe.width:
+            print(f"📐 {probe.width}x{probe.height}, {probe.duration:.1f}s, {probe.size / 1024 / 1024:.1f} MB")
         print("=" * 60)
         
-        # Post to Instagram (prefer Graph API if available)
-        if self.use_instagram_graph:
-            results['instagram_graph'] = self.post_to_instagram_graph(video_path)
-            if results['instagram_graph']:
-                time.sleep(DELAY_BETWEEN_PLATFORMS)
-        elif self.use_instagram_basic:
-            results['instagram_basic'] = self.post_to_instagram_basic(video_path)
-            if results['instagram_basic']:
-                time.sleep(DELAY_BETWEEN_PLATFORMS)
+        # The cooldown between uploads now lives in the token buckets: if one of them is going to
+        # make this video wait, spend that time pre-staging the file
+        if max(self.instagram_bucket.wait_time(), self.facebook_bucket.wait_time()) > 0:
+            threading.Thread(target=prestage_video, args=(probe.path,), daemon=True).start()
         
-        # Post to Facebook
-        if self.use_facebook:
-            results['facebook'] = self.post_to_facebook(video_path)
+        with self.active_lock:
+            self.active_uploads += 1
+            self._start_keepalive()
+        try:
+            # Instagram and Facebook uploads are independent network I/O, so run them side by side
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                fut_ig = executor.submit(self._post_instagram, probe)
+                fut_fb = executor.submit(self.post_to_facebook, probe) if self.use_facebook else None
+                
+                results.update(fut_ig.result())
+                if fut_fb is not None:
+                    results['facebook'] = fut_fb.result()
+        finally:
+            with self.active_lock:
+                self.active_uploads -= 1
         
         return results
 
+# In-memory set of successfully posted filenames/fingerprints, loaded from the index on first use
+_posted_keys = None
+POSTED_LOG_LOCK = threading.Lock()  # Upload workers log results concurrently
+
+def migrate_legacy_posted_log():
+    """Convert the old posted_videos_unified.json array into the JSONL log and filename index."""
+    if POSTED_LOG_FILE.exists() or not LEGACY_POSTED_LOG_FILE.exists():
+        return
+    try:
+        records = http_utils.loads(LEGACY_POSTED_LOG_FILE.read_bytes())
+    except json.JSONDecodeError:
+        return
+    with open(POSTED_LOG_FILE, 'wb') as f:
+        f.writelines(http_utils.dumps_line(record) for record in records)
+    with open(POSTED_INDEX_FILE, 'w') as f:
+        for record in records:
+            f.writelines(key + '\n' for key in posted_keys(record))
+    print(f"📦 Migrated {len(records)} records from {LEGACY_POSTED_LOG_FILE} to {POSTED_LOG_FILE}")
+
 def get_posted_videos():
-    """Load list of posted videos."""
+    """Yield posted-log records one line at a time."""
+    migrate_legacy_posted_log()
     if not POSTED_LOG_FILE.exists():
+        return
+    with open(POSTED_LOG_FILE, 'rb') as f:
+        for line in f:
+            try:
+                yield http_utils.loads(line)
+            except json.JSONDecodeError:
+                # A torn last line from an interrupted write; everything before it is intact
+                continue
+
+def posted_keys(record: dict) -> list:
+    """Index keys for a posted-log record: its filename and content fingerprint, if it was posted."""
+    if not record.get('success'):
         return []
-    try:
-        with open(POSTED_LOG_FILE, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
-        return []
+    return [key for key in (record.get('filename'), record.get('fingerprint')) if key]
+
+def get_posted_keys():
+    """Return the set of successfully posted filenames and fingerprints, read from the index without parsing the log."""
+    global _posted_keys
+    if _posted_keys is None:
+        migrate_legacy_posted_log()
+        if POSTED_INDEX_FILE.exists():
+            _posted_keys = set(POSTED_INDEX_FILE.read_text().splitlines())
+        else:
+            # Index missing (e.g. deleted by hand): rebuild it from the log
+            _posted_keys = {key for item in get_posted_videos() for key in posted_keys(item)}
+            POSTED_INDEX_FILE.write_text(''.join(key + '\n' for key in _posted_keys))
+    return _posted_keys
 
-def add_to_posted_log(video_path: Path, results: dict):
+def add_to_posted_log(probe: VideoProbe, results: dict):
     """Add video to posted log with platform results."""
-    posted_list = get_posted_videos()
-    posted_list.append({
-        "filename": video_path.name,
-        "path": str(video_path),
+    record = {
+        "filename": probe.path.name,
+        "path": str(probe.path),
+        "fingerprint": probe.fingerprint,
         "posted_at": datetime.now().isoformat(),
         "platforms": results,
         "success": any(results.values())
-    })
-    with open(POSTED_LOG_FILE, 'w') as f:
-        json.dump(posted_list, f, indent=4)
+    }
+    with POSTED_LOG_LOCK:
+        known = get_posted_keys()
+        with open(POSTED_LOG_FILE, 'ab') as f:
+            f.write(http_utils.dumps_line(record))
+        new_keys = [key for key in posted_keys(record) if key not in known]
+        if new_keys:
+            with open(POSTED_INDEX_FILE, 'a') as f:
+                f.writelines(key + '\n' for key in new_keys)
+            known.update(new_keys)
 
 def find_latest_upscaled_videos():
     """Find the latest upscaled videos that haven't been posted."""
@@ -281,16 +691,14 @@ def find_latest_upscaled_videos():
     
     # Find latest Run folder
     try:
-        run_folders = sorted(
-            [d for d in COMFYUI_OUTPUT_DIR_BASE.iterdir() if d.is_dir() and d.name.startswith("Run_")],
-            key=lambda x: x.stat().st_mtime,
-            reverse=True
-        )
+        # DirEntry caches its type/stat from the directory listing (free on Windows), unlike Path.stat()
+        with os.scandir(COMFYUI_OUTPUT_DIR_BASE) as it:
+            run_folders = [e for e in it if e.name.startswith("Run_") and e.is_dir()]
         if not run_folders:
             print("❌ No Run folders found")
             return []
         
-        latest_run = run_folders[0]
+        latest_run = Path(max(run_folders, key=lambda e: e.stat().st_mtime).path)
         print(f"📁 Using latest run: {latest_run.name}")
         
     except Exception as e:
@@ -304,18 +712,110 @@ def find_latest_upscaled_videos():
         return []
     
     print(f"📂 Scanning: {upscaled_dir}")
-    all_videos = sorted(upscaled_dir.glob("*_upscaled.mp4"), key=lambda p: p.stat().st_ctime)
+    with os.scandir(upscaled_dir) as it:
+        entries = [e for e in it if e.name.endswith(UPSCALED_SUFFIX) and e.is_file()]
+    # upscale_4k_parallel.py processes compiled videos in name order, so sorting by name
+    # gives the same order as creation time without a stat() per file
+    all_videos = sorted(Path(e.path) for e in entries)
     print(f"📹 Found {len(all_videos)} upscaled videos")
     
     # Filter out already posted
-    posted_videos = get_posted_videos()
-    posted_filenames = [item.get('filename') for item in posted_videos if item.get('success')]
+    posted_filenames = get_posted_keys()
     
     unposted = [v for v in all_videos if v.name not in posted_filenames]
     print(f"📤 Found {len(unposted)} unposted videos")
     
     return unposted
 
+def process_video(poster, video_path: Path):
+    """Post one video everywhere, log it, and return (successful, attempted) platform counts."""
+    # Size, fingerprint and resolution are read once here and reused by every platform upload
+    probe = VideoProbe.from_path(video_path)
+    if probe.fingerprint in get_posted_keys():
+        print(f"⏭️ Skipping {video_path.name}: same content was already posted")
+        return 0, 0
+    
+    results = poster.post_video_to_all_platforms(probe)
+    
+    # Track results
+    successful_platforms = sum(results.values())
+    attempted_platforms = len([k for k, v in results.items() if poster.__dict__.get(f'use_{k.split("_")[0]}', False)])
+    
+    # Log the result
+    add_to_posted_log(probe, results)
+    
+    # Summary for this video
+    print(f"📊 Results: {successful_platforms}/{attempted_platforms} platforms successful")
+    return successful_platforms, attempted_platforms
+
+class UpscaledVideoHandler(FileSystemEventHandler):
+    """Queue *_upscaled.mp4 files as soon as the filesystem reports them."""
+    
+    def __init__(self, video_queue):
+        super().__init__()
+        self.video_queue = video_queue
+    
+    def _enqueue(self, path):
+        video_path = Path(path)
+        if video_path.name.endswith(UPSCALED_SUFFIX) and video_path.parent.name == COMPILED_SUBFOLDER:
+            self.video_queue.put(video_path)
+    
+    def on_created(self, event):
+        if not event.is_directory:
+            self._enqueue(event.src_path)
+    
+    def on_closed(self, event):
+        # Only delivered by inotify (Linux); fires once the writer closes the file
+        if not event.is_directory:
+            self._enqueue(event.src_path)
+    
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._enqueue(event.dest_path)
+
+def wait_until_stable(video_path: Path) -> bool:
+    """Wait until the file stops growing, so we never upload a video that is still being written."""
+    last_size = -1
+    while True:
+        try:
+            size = video_path.stat().st_size
+        except FileNotFoundError:
+            return False
+        if size == last_size and size > 0:
+            return True
+        last_size = size
+        time.sleep(WATCH_STABLE_SECONDS)
+
+def watch_and_post(poster):
+    """Post new upscaled videos as filesystem events arrive instead of re-scanning directories."""
+    if Observer is None:
+        print("❌ --watch requires watchdog: pip install watchdog")
+        return
+    
+    video_queue = queue.Queue()
+    observer = Observer()
+    observer.schedule(UpscaledVideoHandler(video_queue), str(COMFYUI_OUTPUT_DIR_BASE), recursive=True)
+    observer.start()
+    print(f"👀 Watching {COMFYUI_OUTPUT_DIR_BASE} for new upscaled videos (Ctrl+C to stop)...")
+    
+    handled = set(get_posted_keys())
+    try:
+        while True:
+            try:
+                video_path = video_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            if video_path.name in handled or not wait_until_stable(video_path):
+                continue
+            handled.add(video_path.name)
+            # Spacing between uploads is enforced by the per-platform token buckets
+            process_video(poster, video_path)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        observer.stop()
+        observer.join()
+
 def main():
     print("=" * 70)
     print("🚀 UNIFIED SOCIAL MEDIA VIDEO POSTER")
@@ -332,11 +832,15 @@ def main():
             if not poster.use_instagram_graph and not poster.use_facebook:
                 sys.exit(1)
     
+    watch_mode = "--watch" in sys.argv
+    
     # Find videos to post
     videos_to_post = find_latest_upscaled_videos()
     
     if not videos_to_post:
         print("✨ All videos already posted or no new videos found!")
+        if watch_mode:
+            watch_and_post(poster)
         sys.exit(0)
     
     print(f"\n🎯 Will process {len(videos_to_post)} videos")
@@ -346,32 +850,23 @@ def main():
     total_platforms_success = 0
     total_platforms_attempted = 0
     
-    for i, video_path in enumerate(videos_to_post):
+    def post_one(indexed_video):
+        i, video_path = indexed_video
         print(f"\n🎬 Video {i+1}/{len(videos_to_post)}")
-        
-        # Post to all platforms
-        results = poster.post_video_to_all_platforms(video_path)
-        
-        # Track results
-        successful_platforms = sum(results.values())
-        attempted_platforms = len([k for k, v in results.items() if poster.__dict__.get(f'use_{k.split("_")[0]}', False)])
-        
-        total_platforms_success += successful_platforms
-        total_platforms_attempted += attempted_platforms
-        
-        if successful_platforms > 0:
-            successful_videos += 1
-        
-        # Log the result
-        add_to_posted_log(video_path, results)
-        
-        # Summary for this video
-        print(f"📊 Results: {successful_platforms}/{attempted_platforms} platforms successful")
-        
-        # Wait before next video (except for last one)
-        if i < len(videos_to_post) - 1:
-            print(f"⏳ Waiting {DELAY_BETWEEN_VIDEOS} seconds before next video...")
-            time.sleep(DELAY_BETWEEN_VIDEOS)
+        if not video_path.exists():
+            print(f"⚠️ Skipping {video_path.name}: file disappeared")
+            return 0, 0
+        return process_video(poster, video_path)
+    
+    # A few videos upload at once in FIFO order; the per-platform token buckets keep
+    # each platform to its rate limit instead of a blanket sleep between videos
+    with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+        for successful_platforms, attempted_platforms in executor.map(post_one, enumerate(videos_to_post)):
+            total_platforms_success += successful_platforms
+            total_platforms_attempted += attempted_platforms
+            
+            if successful_platforms > 0:
+                successful_videos += 1
     
     # Final summary
     print(f"\n{'='*70}")
@@ -381,6 +876,10 @@ def main():
     print(f"🎯 Platform uploads: {total_platforms_success}/{total_platforms_attempted}")
     print(f"📈 Success rate: {(total_platforms_success/total_platforms_attempted*100):.1f}%" if total_platforms_attempted > 0 else "N/A")
     print(f"{'='*70}")
+    
+    # Keep running and post new videos as they are written
+    if watch_mode:
+        watch_and_post(poster)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
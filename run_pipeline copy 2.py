@@ -7,15 +7,16 @@ This script manages the entire workflow:
 3. Crops the final videos for social media.
 4. Uploads the cropped videos to YouTube.
 5. Terminates the API server once all steps are complete.
+
+The orchestration itself lives in pipeline_runner.py; this file only describes the steps.
 """
 
 from __future__ import annotations
 
-import subprocess
-import sys
-import time
 from pathlib import Path
 
+from pipeline_runner import Pipeline, Step
+
 # --- Configuration ---
 # Set the root directory to the script's location
 ROOT = Path(__file__).resolve().parent
@@ -31,71 +32,22 @@ UPSCALE_SCRIPT = ROOT / "upscale_4k_parallel.py"
 REELS_CROP_SCRIPT = ROOT / "crop_to_reels.py"
 YOUTUBE_POST_SCRIPT = ROOT / "youtube_shorts_poster.py"
 
+API_SERVER_PORT = 8000  # Port the API server listens on
+LOG_FILE = ROOT / "pipeline_log.txt"
 
-def run_step(cmd: list[str], step_name: str) -> None:
-    """Run a command with clear logging and raise an exception if it fails."""
-    print("\n" + "="*60)
-    print(f"▶️  STARTING STEP: {step_name}")
-    print(f"    Executing command: {' '.join(cmd)}")
-    print("="*60)
-    
-    # Using check=True will automatically raise an error if the script returns a non-zero exit code
-    subprocess.run(cmd, check=True)
-    
-    print("\n" + "-"*60)
-    print(f"✅ FINISHED STEP: {step_name}")
-    print("-"*60)
+STEPS = [
+    Step(AUTOMATION_SCRIPT, "Video Generation"),
+    Step(BEAT_SYNC_SCRIPT, "Beat Synchronization"),
+    Step(UPSCALE_SCRIPT, "4K Upscaling"),
+    Step(REELS_CROP_SCRIPT, "Cropping Videos for Reels/Shorts", in_process=True),
+    Step(YOUTUBE_POST_SCRIPT, "Uploading to YouTube", in_process=True),
+]
 
 
 def main() -> None:
     """Main function to orchestrate the entire pipeline."""
-    # Start the API server as a background process
-    print("🚀 Starting the background API server...")
-    api_proc = subprocess.Popen([sys.executable, str(API_SERVER)])
-    
-    try:
-        # Give the server a moment to initialize before starting the main tasks
-        print("    Waiting for 5 seconds for the server to spin up...")
-        time.sleep(5)
-
-        # --- Run all pipeline steps in sequential order ---
-        run_step([sys.executable, str(AUTOMATION_SCRIPT)], "Video Generation")
-        run_step([sys.executable, str(BEAT_SYNC_SCRIPT)], "Beat Synchronization")
-        run_step([sys.executable, str(UPSCALE_SCRIPT)], "4K Upscaling")
-        
-        # --- Post-processing and Uploading ---
-        run_step([sys.executable, str(REELS_CROP_SCRIPT)], "Cropping Videos for Reels/Shorts")
-        run_step([sys.executable, str(YOUTUBE_POST_SCRIPT)], "Uploading to YouTube")
-
-        print("\n🎉🎉🎉 ALL PIPELINE STEPS COMPLETED SUCCESSFULLY! 🎉🎉🎉")
-
-    except subprocess.CalledProcessError as e:
-        print("\n" + "!"*60)
-        print(f"❌ A CRITICAL ERROR OCCURRED IN A SUB-PROCESS.")
-        print(f"   The pipeline has been stopped.")
-        print(f"   Failed command: {' '.join(e.cmd)}")
-        print(f"   Exit code: {e.returncode}")
-        print("!"*60)
-
-    except Exception as e:
-        print("\n" + "!"*60)
-        print(f"❌ AN UNEXPECTED ERROR OCCURRED: {e}")
-        print(f"   The pipeline has been stopped.")
-        print("!"*60)
-
-    finally:
-        # This block will always run, whether the steps succeeded or failed.
-        print("\n🛑 Stopping the background API server...")
-        api_proc.terminate()
-        try:
-            # Wait for the process to terminate gracefully
-            api_proc.wait(timeout=10)
-            print("    API server stopped.")
-        except subprocess.TimeoutExpired:
-            # If it doesn't stop, force kill it
-            print("    API server did not respond, killing process.")
-            api_proc.kill()
+    Pipeline("Dancer Pipeline", API_SERVER, API_SERVER_PORT, STEPS, LOG_FILE).main(confirm=False)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
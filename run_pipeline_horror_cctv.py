@@ -11,36 +11,18 @@ HORROR CCTV PIPELINE: API SERVER + AUTOMATION + LIFECYCLE MANAGEMENT
 
 import subprocess
 import sys
-import time
 import signal
 import threading
 import os
 from pathlib import Path
 
-# === UNICODE FIX FOR HORROR CCTV PIPELINE ===
-if sys.platform == "win32":
-    os.environ["PYTHONIOENCODING"] = "utf-8"
-    try:
-        if hasattr(sys.stdout, 'reconfigure'):
-            sys.stdout.reconfigure(encoding='utf-8')
-            sys.stderr.reconfigure(encoding='utf-8')
-    except:
-        pass
+from _utf8_bootstrap import configure_utf8
+from pipeline_runner import safe_log_message, wait_for_port
+
+configure_utf8()  # UTF-8 console + PYTHONUTF8 for child processes
 
-def safe_log_message(message):
-    """Sanitize Unicode characters for safe logging and printing."""
-    if isinstance(message, str):
-        replacements = {
-            '🎬': '[MOVIE]', '🔤': '[TEXT]', '🟢': '[GREEN]', '📝': '[MEMO]',
-            '✅': '[OK]', '❌': '[ERROR]', '⚠️': '[WARN]', '🧹': '[CLEAN]',
-            '⏹️': '[STOP]', '🔥': '[FIRE]', '🚀': '[ROCKET]', '📊': '[CHART]',
-            '🛑': '[STOP_SIGN]', '💪': '[MUSCLE]', '🏋️': '[WEIGHT]', '📋': '[CLIPBOARD]'
-        }
-        safe_message = message
-        for unicode_char, replacement in replacements.items():
-            safe_message = safe_message.replace(unicode_char, replacement)
-        return safe_message
-    return str(message)
+# Child output is streamed through pipes; unbuffered children keep it live instead of in 8 KB bursts
+os.environ.setdefault("PYTHONUNBUFFERED", "1")
 
 print(safe_log_message("🎬 Horror CCTV Pipeline Runner Starting..."))
 
@@ -49,7 +31,12 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 API_SERVER_SCRIPT = SCRIPT_DIR / "api_server_v5_horror_cctv.py"
 MAIN_AUTOMATION_SCRIPT = SCRIPT_DIR / "main_automation_horror_cctv.py"
 API_SERVER_PORT = 8002
-STARTUP_DELAY = 10  # Seconds to wait for API server startup
+API_STARTUP_TIMEOUT = 15  # Max seconds to wait for the API server to accept connections
+
+# Child command lines, built once
+PY = sys.executable or "python"
+API_CMD = [PY, str(API_SERVER_SCRIPT)]
+AUTO_CMD = [PY, str(MAIN_AUTOMATION_SCRIPT)]
 
 # --- Global Variables ---
 api_server_process = None
@@ -93,15 +80,6 @@ def cleanup_and_exit():
     print(safe_log_message("✅ Horror CCTV pipeline cleanup completed"))
     sys.exit(0)
 
-def check_python_executable():
-    """Verify Python executable"""
-    python_cmd = sys.executable
-    if not python_cmd:
-        python_cmd = "python"
-    
-    print(f"Using Python: {python_cmd}")
-    return python_cmd
-
 def verify_scripts_exist():
     """Verify all required Horror CCTV scripts exist"""
     missing_scripts = []
@@ -127,11 +105,9 @@ def start_api_server():
     
     print(safe_log_message(f"🚀 Starting Horror CCTV API Server on port {API_SERVER_PORT}..."))
     
-    python_cmd = check_python_executable()
-    
     try:
         api_server_process = subprocess.Popen(
-            [python_cmd, str(API_SERVER_SCRIPT)],
+            API_CMD,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
             text=True,
@@ -154,8 +130,9 @@ def start_api_server():
         api_monitor_thread = threading.Thread(target=monitor_api_server, daemon=True)
         api_monitor_thread.start()
         
-        print(f"Waiting {STARTUP_DELAY} seconds for Horror CCTV API server startup...")
-        time.sleep(STARTUP_DELAY)
+        print(f"Waiting up to {API_STARTUP_TIMEOUT} seconds for Horror CCTV API server startup...")
+        if not wait_for_port(API_SERVER_PORT, api_server_process, API_STARTUP_TIMEOUT) and api_server_process.poll() is None:
+            print(safe_log_message(f"⚠️ Horror CCTV API Server not listening on port {API_SERVER_PORT} yet, continuing"))
         
         # Check if process is still running
         if api_server_process.poll() is None:
@@ -175,26 +152,24 @@ def run_main_automation():
     
     print(safe_log_message("🎬 Starting Horror CCTV Main Automation..."))
     
-    python_cmd = check_python_executable()
-    
     try:
+        # Binary pipe: the output is only passed through, so there's no need to decode it line by line
         automation_process = subprocess.Popen(
-            [python_cmd, str(MAIN_AUTOMATION_SCRIPT)],
+            AUTO_CMD,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True,
-            encoding='utf-8',
-            errors='replace',
-            bufsize=1,
-            universal_newlines=True
+            bufsize=-1
         )
         
         print(safe_log_message("📊 Horror CCTV Automation Output:"))
         print("=" * 60)
+        sys.stdout.flush()
         
-        # Stream automation output in real-time
-        for line in iter(automation_process.stdout.readline, ''):
-            print(f"{line.rstrip()}")
+        # Stream automation output in real-time, in large chunks straight to our stdout
+        out_fd = automation_process.stdout.fileno()
+        while chunk := os.read(out_fd, 65536):
+            sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
         
         # Wait for automation to complete
         automation_process.wait()
@@ -224,9 +199,10 @@ def main():
     print(safe_log_message("🎬" + "=" * 58 + "🎬"))
     print()
     print("Configuration:")
+    print(f"   Python: {PY}")
     print(f"   Script Directory: {SCRIPT_DIR}")
     print(f"   API Server Port: {API_SERVER_PORT}")
-    print(f"   Startup Delay: {STARTUP_DELAY}s")
+    print(f"   Startup Timeout: {API_STARTUP_TIMEOUT}s")
     print()
     
     # Setup signal handlers for graceful shutdown
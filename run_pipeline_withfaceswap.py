@@ -9,27 +9,14 @@ This script runs the faceswap pipeline:
 5. Generate Viral Metadata (optional)
 
 NOTE: Excludes reels generation and YouTube upload as requested.
+The orchestration itself lives in pipeline_runner.py; this file only describes the steps.
 """
 
 from __future__ import annotations
 
-import subprocess
-import sys
-import time
-import json
-import os
 from pathlib import Path
-from datetime import datetime
 
-# === UNICODE FIX FOR PIPELINE RUNNER ===
-if sys.platform == "win32":
-    os.environ["PYTHONIOENCODING"] = "utf-8"
-    try:
-        if hasattr(sys.stdout, 'reconfigure'):
-            sys.stdout.reconfigure(encoding='utf-8')
-            sys.stderr.reconfigure(encoding='utf-8')
-    except:
-        pass
+from pipeline_runner import Pipeline, Step
 
 ROOT = Path(__file__).resolve().parent
 
@@ -46,303 +33,36 @@ METADATA_GENERATOR_SCRIPT = ROOT / "youtube_metadata_generator.py"
 
 # === CONFIGURATION ===
 ENABLE_METADATA_GENERATION = True  # Set to False to skip AI metadata generation
-DELAY_BETWEEN_STEPS = 3  # Seconds to wait between major steps
+API_SERVER_PORT = 8000  # Port api_server_v5_withfaceswap.py listens on
 LOG_FILE = ROOT / "pipeline_log_faceswap.txt"
 
-def safe_log_message(message):
-    """Sanitize Unicode characters for safe logging."""
-    if isinstance(message, str):
-        replacements = {
-            '🔥': '[FIRE]', '🎭': '[THEATER]', '👗': '[DRESS]', '✅': '[OK]',
-            '❌': '[ERROR]', '⚠️': '[WARN]', '🚀': '[ROCKET]', '📝': '[MEMO]',
-            '📊': '[CHART]', '🎬': '[MOVIE]', '🖼️': '[IMAGE]', '💃': '[DANCER]',
-            '🟢': '[GREEN]', '🎉': '[PARTY]', '📤': '[UPLOAD]', '🛑': '[STOP]',
-            '⏰': '[CLOCK]', '⏱️': '[TIMER]', '🛡️': '[SHIELD]', '🔍': '[SEARCH]',
-            '🎨': '[ART]', '🔄': '[SYNC]', '⚡': '[FAST]', '🎪': '[CIRCUS]'
-        }
-        safe_message = message
-        for unicode_char, replacement in replacements.items():
-            safe_message = safe_message.replace(unicode_char, replacement)
-        return safe_message
-    return str(message)
-
-class FaceswapPipelineRunner:
-    def __init__(self):
-        self.start_time = datetime.now()
-        self.api_proc = None
-        self.completed_steps = []
-        self.failed_steps = []
-        
-    def log(self, message: str, level: str = "INFO"):
-        """Log message to both console and file with Unicode safety."""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        safe_message = safe_log_message(message)
-        log_entry = f"[{timestamp}] [{level}] {safe_message}"
-        print(log_entry)
-        
-        try:
-            with open(LOG_FILE, "a", encoding="utf-8") as f:
-                f.write(log_entry + "\n")
-        except Exception:
-            pass  # Don't fail pipeline due to logging issues
-
-    def run_step(self, script_path: Path, step_name: str, required: bool = True) -> bool:
-        """Run a pipeline step with Unicode-safe subprocess handling."""
-        if not script_path.exists():
-            self.log(f"[ERROR] MISSING SCRIPT: {script_path}", "ERROR")
-            if required:
-                self.log(f"[STOP] Pipeline stopped - required script missing", "FATAL")
-                return False
-            else:
-                self.log(f"[WARN] Skipping optional step: {step_name}", "WARN")
-                return True
-        
-        cmd = [sys.executable, str(script_path)]
-        self.log(f"[ROCKET] Starting Step: {step_name}")
-        self.log(f"   Command: {' '.join(cmd)}")
-        
-        try:
-            # === CRITICAL FIX: Don't capture output to avoid Unicode issues ===
-            result = subprocess.run(
-                cmd, 
-                check=True,
-                text=True,
-                encoding='utf-8',
-                errors='replace'  # Replace problematic characters instead of failing
-            )
-            
-            self.log(f"[OK] COMPLETED: {step_name}")
-            self.completed_steps.append(step_name)
-            return True
-            
-        except subprocess.CalledProcessError as e:
-            self.log(f"[ERROR] FAILED: {step_name}", "ERROR")
-            self.log(f"   Exit code: {e.returncode}", "ERROR")
-            
-            self.failed_steps.append(step_name)
-            
-            if required:
-                self.log(f"[STOP] Pipeline stopped due to required step failure", "FATAL")
-                return False
-            else:
-                self.log(f"[WARN] Continuing despite optional step failure", "WARN")
-                return True
-                
-        except Exception as e:
-            error_msg = str(e).encode('ascii', errors='replace').decode('ascii')
-            self.log(f"[ERROR] UNEXPECTED ERROR in {step_name}: {error_msg}", "ERROR")
-            self.failed_steps.append(step_name)
-            return not required
-
-    def start_api_server(self) -> bool:
-        """Start the API server in background."""
-        if not API_SERVER.exists():
-            self.log(f"[ERROR] FATAL: API server script not found: {API_SERVER}", "FATAL")
-            return False
-            
-        self.log("[ROCKET] Starting Faceswap API server in background...")
-        try:
-            # Start with Unicode-safe environment
-            env = os.environ.copy()
-            env["PYTHONIOENCODING"] = "utf-8"
-            
-            self.api_proc = subprocess.Popen(
-                [sys.executable, str(API_SERVER)],
-                env=env,
-                encoding='utf-8',
-                errors='replace'
-            )
-            self.log(f"   API server PID: {self.api_proc.pid}")
-            
-            # Give server time to start
-            self.log("   Waiting for API server to initialize...")
-            time.sleep(8)
-            
-            # Check if process is still running
-            if self.api_proc.poll() is not None:
-                self.log("[ERROR] API server failed to start or crashed immediately", "ERROR")
-                return False
-                
-            self.log("[OK] Faceswap API server started successfully")
-            return True
-            
-        except Exception as e:
-            error_msg = str(e).encode('ascii', errors='replace').decode('ascii')
-            self.log(f"[ERROR] Failed to start API server: {error_msg}", "ERROR")
-            return False
-
-    def stop_api_server(self):
-        """Gracefully stop the API server."""
-        if self.api_proc:
-            self.log("[STOP] Stopping API server...")
-            try:
-                self.api_proc.terminate()
-                try:
-                    self.api_proc.wait(timeout=15)
-                    self.log("[OK] API server stopped gracefully")
-                except subprocess.TimeoutExpired:
-                    self.log("[WARN] API server timeout, force killing...")
-                    self.api_proc.kill()
-                    self.log("[OK] API server force stopped")
-            except Exception as e:
-                error_msg = str(e).encode('ascii', errors='replace').decode('ascii')
-                self.log(f"[WARN] Error stopping API server: {error_msg}", "WARN")
-
-    def run_faceswap_pipeline(self) -> bool:
-        """Run the complete faceswap pipeline (excludes reels and YouTube upload)."""
-        self.log("=" * 80)
-        self.log("[MOVIE] STARTING COMPLETE FACESWAP DANCER CONTENT PIPELINE")
-        self.log("[ART] Features: Dynamic Prompts + Random Face Selection + Telegram Approval")
-        self.log("[MEMO] Excluded: Reels generation and YouTube upload (as requested)")
-        self.log("=" * 80)
-        
-        # Step 0: Start API Server
-        if not self.start_api_server():
-            return False
-            
-        try:
-            # Step 1: Content Generation with Faceswap (Images + Videos)
-            self.log("[ART] Step 1: Faceswap Content Generation (with dynamic prompts and Telegram approval)")
-            if not self.run_step(AUTOMATION_SCRIPT, "Faceswap Content Generation", required=True):
-                return False
-            time.sleep(DELAY_BETWEEN_STEPS)
-
-            # Step 2: Beat Synchronization
-            self.log("[SYNC] Step 2: Beat Synchronization")
-            if not self.run_step(BEAT_SYNC_SCRIPT, "Beat Synchronization", required=True):
-                return False
-            time.sleep(DELAY_BETWEEN_STEPS)
-
-            # Step 3: 4K Upscaling
-            self.log("[FAST] Step 3: 4K Upscaling")
-            if not self.run_step(UPSCALE_SCRIPT, "4K Upscaling", required=True):
-                return False
-            time.sleep(DELAY_BETWEEN_STEPS)
-
-            # Step 4: Generate Viral Metadata (Optional)
-            if ENABLE_METADATA_GENERATION:
-                self.log("[MEMO] Step 4: Viral Metadata Generation (Optional)")
-                if not self.run_step(METADATA_GENERATOR_SCRIPT, "Viral Metadata Generation", required=False):
-                    self.log("[WARN] Metadata generation failed, will use fallback if needed", "WARN")
-                time.sleep(DELAY_BETWEEN_STEPS)
-
-            # EXCLUDED STEPS (as requested):
-            # - Crop to Reels Format (skip for faceswap version)
-            # - Upload to YouTube (skip for faceswap version)
-            
-            self.log("[OK] Faceswap pipeline completed successfully!")
-            self.log("[MEMO] Note: Reels generation and YouTube upload were skipped as requested")
-            return True
-            
-        finally:
-            self.stop_api_server()
-
-    def print_final_summary(self):
-        """Print a comprehensive summary of the faceswap pipeline run."""
-        end_time = datetime.now()
-        duration = end_time - self.start_time
-        
-        self.log("=" * 80)
-        self.log("[CHART] FACESWAP PIPELINE EXECUTION SUMMARY")
-        self.log("=" * 80)
-        self.log(f"[CLOCK] Start Time: {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}")
-        self.log(f"[CLOCK] End Time: {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
-        self.log(f"[TIMER] Total Duration: {str(duration).split('.')[0]}")
-        self.log("")
-        
-        self.log(f"[OK] Completed Steps ({len(self.completed_steps)}):")
-        for step in self.completed_steps:
-            self.log(f"   [OK] {step}")
-            
-        if self.failed_steps:
-            self.log(f"[ERROR] Failed Steps ({len(self.failed_steps)}):")
-            for step in self.failed_steps:
-                self.log(f"   [ERROR] {step}")
-        
-        self.log("")
-        if len(self.failed_steps) == 0:
-            self.log("[PARTY] FACESWAP PIPELINE COMPLETED SUCCESSFULLY!")
-            self.log("   All personalized content generated and ready!")
-            self.log("   [ART] Features used: Random face selection + Telegram approval")
-        elif len(self.completed_steps) >= 3:  # At least core steps completed
-            self.log("[WARN] FACESWAP PIPELINE PARTIALLY COMPLETED")
-            self.log("   Core content generated but some final steps failed")
-        else:
-            self.log("[ERROR] FACESWAP PIPELINE FAILED")
-            self.log("   Critical steps failed - check logs for details")
-            
-        self.log("=" * 80)
-
-def check_required_scripts():
-    """Check if all required scripts exist for faceswap pipeline."""
-    required_scripts = [
-        (API_SERVER, "Faceswap API Server", True),
-        (AUTOMATION_SCRIPT, "Faceswap Main Automation", True), 
-        (BEAT_SYNC_SCRIPT, "Beat Sync", True),
-        (UPSCALE_SCRIPT, "4K Upscaling", True),
-        (METADATA_GENERATOR_SCRIPT, "Metadata Generator", False)
+def build_steps() -> list:
+    # Each step waits for the one before it unless `after` says otherwise
+    steps = [
+        Step(AUTOMATION_SCRIPT, "Faceswap Content Generation"),
+        Step(BEAT_SYNC_SCRIPT, "Beat Synchronization"),
+        Step(UPSCALE_SCRIPT, "4K Upscaling"),
     ]
-    
-    # EXCLUDED SCRIPTS (as requested):
-    # - CROP_TO_REELS_SCRIPT (not needed for faceswap version)
-    # - YOUTUBE_UPLOADER_SCRIPT (not needed for faceswap version)
-    
-    missing_required = []
-    missing_optional = []
-    
-    for script_path, name, required in required_scripts:
-        if not script_path.exists():
-            if required:
-                missing_required.append(f"[ERROR] {name}: {script_path}")
-            else:
-                missing_optional.append(f"[WARN] {name}: {script_path}")
-        else:
-            print(f"[OK] {name}: Found")
-    
-    if missing_required:
-        print("\n[STOP] MISSING REQUIRED SCRIPTS:")
-        for missing in missing_required:
-            print(f"   {missing}")
-        print("\n[MEMO] Faceswap pipeline cannot run without these scripts!")
-        return False
-        
-    if missing_optional:
-        print("\n[WARN] MISSING OPTIONAL SCRIPTS:")
-        for missing in missing_optional:
-            print(f"   {missing}")
-        print("   Pipeline will run but some features will be skipped")
-    
-    print("\n[MEMO] Excluded features (as requested):")
-    print("   - Reels generation (crop_to_reels.py)")
-    print("   - YouTube upload (youtube_shorts_poster.py)")
-    
-    return True
+    if ENABLE_METADATA_GENERATION:
+        # Metadata is built from the run's details JSON, so it runs as its own process alongside beat sync/upscale
+        steps.append(Step(METADATA_GENERATOR_SCRIPT, "Viral Metadata Generation", required=False,
+                          failure_note="[WARN] Metadata generation failed, will use fallback if needed",
+                          after=("Faceswap Content Generation",)))
+    return steps
 
 def main() -> None:
-    print("[SEARCH] Checking faceswap pipeline scripts...")
-    if not check_required_scripts():
-        print("\n[ERROR] Please ensure all required scripts are present")
-        sys.exit(1)
-    
-    print(f"\n[GEAR] Faceswap Pipeline Configuration:")
-    print(f"   [ART] Face Selection: Random from source_faces/")
-    print(f"   [ROBOT] AI Metadata: {'Enabled' if ENABLE_METADATA_GENERATION else 'Disabled'}")
-    print(f"   [TIMER] Step Delay: {DELAY_BETWEEN_STEPS}s")
-    print(f"   [MEMO] Excluded: Reels generation and YouTube upload")
-    
-    # Ask for confirmation
-    response = input(f"\n[ROCKET] Ready to start faceswap pipeline? (y/N): ").lower().strip()
-    if response not in ['y', 'yes']:
-        print("Faceswap pipeline cancelled by user")
-        sys.exit(0)
-    
-    # Run the pipeline
-    runner = FaceswapPipelineRunner()
-    success = runner.run_faceswap_pipeline()
-    runner.print_final_summary()
-    
-    # Exit with appropriate code
-    sys.exit(0 if success else 1)
+    pipeline = Pipeline(
+        "Faceswap Pipeline", API_SERVER, API_SERVER_PORT, build_steps(), LOG_FILE,
+        banner=(
+            "[ART] Features: Dynamic Prompts + Random Face Selection + Telegram Approval",
+            "[MEMO] Excluded: Reels generation and YouTube upload (as requested)",
+        )
+    )
+    pipeline.main(config_lines=(
+        "[ART] Face Selection: Random from source_faces/",
+        f"[ROBOT] AI Metadata: {'Enabled' if ENABLE_METADATA_GENERATION else 'Disabled'}",
+        "[MEMO] Excluded: Reels generation and YouTube upload",
+    ))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -4,8 +4,11 @@ Facebook & Instagram API Setup Helper
 Step-by-step guide to get all required credentials
 """
 import os
-import requests
 from dotenv import load_dotenv
+import http_utils
+
+# Shared keep-alive session: the token check and the pages lookup reuse one TLS connection
+graph_session = http_utils.create_session("https://graph.facebook.com", pool_connections=1, pool_maxsize=1)
 
 def test_token(token, token_type="Unknown"):
     """Test if a token is valid"""
@@ -13,7 +16,7 @@ def test_token(token, token_type="Unknown"):
     params = {"access_token": token}
     
     try:
-        response = requests.get(url, params=params)
+        response = graph_session.get(url, params=params, timeout=10)
         if response.status_code == 200:
             data = response.json()
             print(f"✅ {token_type} Token is VALID")
@@ -37,7 +40,7 @@ def get_pages(token):
     }
     
     try:
-        response = requests.get(url, params=params)
+        response = graph_session.get(url, params=params, timeout=10)
         if response.status_code == 200:
             return response.json().get('data', [])
         else:
@@ -6,6 +6,7 @@ from pathlib import Path
 from dotenv import load_dotenv
 from instagrapi import Client
 from instagrapi.exceptions import LoginRequired
+import http_utils
 
 # ==============================================================================
 #  CONFIGURATION
@@ -16,6 +17,8 @@ load_dotenv()
 # --- Instagram Credentials ---
 INSTA_USERNAME = os.getenv("INSTA_USERNAME")
 INSTA_PASSWORD = os.getenv("INSTA_PASSWORD")
+SESSION_FILE = Path(f"{INSTA_USERNAME}_session.json")
+SESSION_VERIFY_AGE = 7 * 24 * 3600  # cached sessions older than this are checked with Instagram before reuse
 
 # --- Directory Settings (Must match your video cropper script) ---
 DANCERS_CONTENT_BASE = Path(r"H:\dancers_content")
@@ -25,6 +28,7 @@ REELS_SUBFOLDER = "reels"
 
 # --- Tracking File ---
 POSTED_LOG_FILE = Path("posted_videos.json")
+_POSTED_CACHE = None  # filename -> None (an ordered set), loaded from POSTED_LOG_FILE on first use
 
 # --- UPLOAD DELAY ---
 # IMPORTANT: Delay in seconds between each upload to avoid spamming Instagram's API.
@@ -36,19 +40,53 @@ DELAY_BETWEEN_UPLOADS_SECONDS = 300
 #  HELPER FUNCTIONS (Same as before, with minor logging adjustments)
 # ==============================================================================
 
+def reset_session(client: Client):
+    """Drop a session Instagram rejected, keeping the device uuids so the next login comes from the same 'phone'."""
+    uuids = client.get_settings().get("uuids")
+    client.set_settings({})
+    if uuids:
+        client.set_uuids(uuids)
+
+def relogin(client: Client) -> bool:
+    """Replace a session rejected mid-run (it was trusted without a check) with a fresh password login."""
+    print("  INFO: Instagram rejected the cached session, logging in again...")
+    reset_session(client)
+    try:
+        client.login(INSTA_USERNAME, INSTA_PASSWORD)
+    except Exception as e:
+        print(f"  ❌ CRITICAL: Re-login failed: {e}")
+        return False
+    if not client.user_id:
+        print("  ❌ CRITICAL: Re-login failed. 2FA might be required.")
+        return False
+    client.dump_settings(SESSION_FILE)
+    return True
+
 def login_to_instagram(client: Client):
     """Logs into Instagram, using a cached session if available."""
-    session_file = Path(f"{INSTA_USERNAME}_session.json")
     print("INFO: Attempting to log in to Instagram...")
     try:
-        if session_file.exists():
-            client.load_settings(session_file)
+        if SESSION_FILE.exists():
+            client.load_settings(SESSION_FILE)
             print("INFO: Loaded existing session.")
+            
+            # A recent session is trusted as-is; an older one is checked once before being reused
+            if client.user_id and time.time() - SESSION_FILE.stat().st_mtime < SESSION_VERIFY_AGE:
+                print(f"✅ SUCCESS: Reusing recent session for '{INSTA_USERNAME}'.")
+                return True
+            try:
+                client.get_timeline_feed()
+                client.dump_settings(SESSION_FILE)  # refreshes the file's age
+                print(f"✅ SUCCESS: Cached session for '{INSTA_USERNAME}' is still valid.")
+                return True
+            except LoginRequired:
+                print("INFO: Cached session expired, logging in again.")
+                reset_session(client)
         
         client.login(INSTA_USERNAME, INSTA_PASSWORD)
         if not client.user_id:
             raise LoginRequired("Login check failed. 2FA might be required.")
-        client.dump_settings(session_file)
+        client.dump_settings(SESSION_FILE)
         print(f"✅ SUCCESS: Logged in as '{client.username}'.")
         return True
     except LoginRequired:
@@ -58,22 +96,33 @@ def login_to_instagram(client: Client):
         print(f"\n❌ CRITICAL: An unexpected error during login: {e}\n")
         return False
 
+def _load_posted():
+    """Reads the log file once per run; later lookups and appends use the in-memory copy."""
+    global _POSTED_CACHE
+    if _POSTED_CACHE is None:
+        posted_list = []
+        if POSTED_LOG_FILE.exists():
+            try:
+                with open(POSTED_LOG_FILE, 'rb') as f:
+                    posted_list = http_utils.loads(f.read())
+            except (json.JSONDecodeError, FileNotFoundError):
+                pass
+        _POSTED_CACHE = dict.fromkeys(posted_list)
+    return _POSTED_CACHE
+
 def get_posted_videos():
     """Loads the list of already posted video filenames from the log file."""
-    if not POSTED_LOG_FILE.exists():
-        return []
-    try:
-        with open(POSTED_LOG_FILE, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
-        return []
+    return list(_load_posted())
 
 def add_to_posted_log(video_path: Path):
     """Adds a video filename to the log of posted videos."""
-    posted_list = get_posted_videos()
-    posted_list.append(video_path.name)
-    with open(POSTED_LOG_FILE, 'w') as f:
-        json.dump(posted_list, f, indent=4)
+    posted = _load_posted()
+    posted[video_path.name] = None
+    # Write a temp file and swap it in, so a crash mid-write can't truncate the log
+    tmp_path = POSTED_LOG_FILE.with_name(POSTED_LOG_FILE.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(http_utils.dumps_pretty(list(posted)))
+    os.replace(tmp_path, POSTED_LOG_FILE)
     # No print statement here, we will summarize at the end.
 
 def find_all_unposted_upscaled_videos():
@@ -83,15 +132,17 @@ def find_all_unposted_upscaled_videos():
     """
     print("INFO: Searching for the latest 'Run_*' folder...")
     try:
-        run_folders = sorted(
-            [d for d in DANCERS_CONTENT_BASE.iterdir() if d.is_dir() and d.name.startswith("Run_")],
-            key=lambda x: x.stat().st_mtime,
-            reverse=True
-        )
-        if not run_folders:
+        # One scandir pass (DirEntry caches stat info) and max() instead of a stat-per-folder sort
+        with os.scandir(DANCERS_CONTENT_BASE) as entries:
+            latest_entry = max(
+                (e for e in entries if e.is_dir(follow_symlinks=False) and e.name.startswith("Run_")),
+                key=lambda e: e.stat().st_mtime,
+                default=None
+            )
+        if latest_entry is None:
             print("ERROR: No 'Run_*' folders found.")
             return []
-        latest_run_folder = run_folders[0]
+        latest_run_folder = Path(latest_entry.path)
         print(f"INFO: Using latest run folder: {latest_run_folder.name}")
     except Exception as e:
         print(f"ERROR: Could not find latest run folder: {e}")
@@ -103,15 +154,21 @@ def find_all_unposted_upscaled_videos():
         return []
 
     print(f"INFO: Scanning for unposted upscaled videos in: {upscaled_dir}")
-    posted_videos = get_posted_videos()
-    all_upscaled = sorted(upscaled_dir.glob("*_upscaled.mp4"), key=lambda p: p.stat().st_ctime)
-    
-    print(f"INFO: Found {len(all_upscaled)} upscaled videos total")
-    
-    unposted_videos = [
-        video_path for video_path in all_upscaled if video_path.name not in posted_videos
-    ]
+    posted_videos = _load_posted()  # dict keys: O(1) membership instead of a list scan per video
+    # Filter on the name first (a set lookup) so only unposted videos are stat'ed and sorted
+    total_upscaled = 0
+    unposted_entries = []
+    with os.scandir(upscaled_dir) as entries:
+        for entry in entries:
+            if not entry.name.endswith("_upscaled.mp4"):
+                continue
+            total_upscaled += 1
+            if entry.name not in posted_videos:
+                unposted_entries.append(entry)
+    unposted_entries.sort(key=lambda e: e.stat().st_ctime)
+    unposted_videos = [Path(e.path) for e in unposted_entries]
     
+    print(f"INFO: Found {total_upscaled} upscaled videos total")
     print(f"INFO: Found {len(unposted_videos)} unposted upscaled videos")
     return unposted_videos
 
@@ -150,6 +207,7 @@ if __name__ == "__main__":
     
     successful_uploads = 0
     failed_uploads = 0
+    relogged_in = False  # A recent session is trusted without a check, so allow one re-login if it was revoked
 
     # Step 3: Loop and upload all videos
     for i, video_path in enumerate(videos_to_post):
@@ -157,10 +215,20 @@ if __name__ == "__main__":
         print(f"UPLOADING VIDEO {i + 1} of {total_videos}: '{video_path.name}'")
         
         try:
-            client.clip_upload(
-                path=video_path,
-                caption=""  # No caption, as requested
-            )
+            try:
+                client.clip_upload(
+                    path=video_path,
+                    caption=""  # No caption, as requested
+                )
+            except LoginRequired:
+                if relogged_in:
+                    raise
+                relogged_in = True
+                if not relogin(client):
+                    print("  Stopping: every further upload would fail the same way.")
+                    failed_uploads += total_videos - i
+                    break
+                client.clip_upload(path=video_path, caption="")
             print(f"  ✅ SUCCESS: Uploaded successfully!")
             add_to_posted_log(video_path)
             successful_uploads += 1
@@ -8,11 +8,16 @@ import os
 import sys
 import json
 import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
 from datetime import datetime
 from instagrapi import Client
 from instagrapi.exceptions import LoginRequired
+import http_utils
 
 # Load environment variables
 load_dotenv()
@@ -26,14 +31,51 @@ COMPILED_SUBFOLDER = "compiled"
 # Instagram credentials
 INSTA_USERNAME = os.getenv("INSTA_USERNAME")
 INSTA_PASSWORD = os.getenv("INSTA_PASSWORD")
+SESSION_FILE = Path(f"{INSTA_USERNAME}_session.json")
+SESSION_VERIFY_AGE = 7 * 24 * 3600  # a session saved within this many seconds is reused without a check
 
 # Settings
-DELAY_BETWEEN_UPLOADS_SECONDS = 300  # 5 minutes between uploads
-POSTED_LOG_FILE = Path("posted_videos_simple.json")
+DELAY_BETWEEN_UPLOADS_SECONDS = 300  # 5 minutes between upload starts
+MAX_CONCURRENT_UPLOADS = 2  # an upload still in flight doesn't hold back the next one
+PREFETCH_CHUNK_BYTES = 1024 * 1024  # Read size when warming the page cache without posix_fadvise (Windows)
+FINGERPRINT_SAMPLE_BYTES = 1024 * 1024  # Bytes hashed from each end of a video for its content fingerprint
+FINGERPRINT_WORKERS = 8  # Candidate videos fingerprinted concurrently (disk reads, GIL released)
+POSTED_LOG_FILE = Path("posted_videos_simple.jsonl")  # Append-only, one JSON record per line
+LEGACY_POSTED_LOG_FILE = Path("posted_videos_simple.json")  # Old single-array log, migrated on first run
+
+class UploadPacer:
+    """Hands out upload start times at least `interval` seconds apart, across threads."""
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.next_start = 0.0
+        self.stopped = threading.Event()
+    
+    def reserve(self) -> float:
+        """Claim the next start slot; returns the seconds until it."""
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_start)
+            self.next_start = start + self.interval
+        return start - now
+    
+    def wait(self, delay: float) -> bool:
+        """Sleep until a reserved slot; False if the run was stopped meanwhile."""
+        if delay > 0:
+            print(f"⏳ Waiting {delay:.0f} seconds before next upload...")
+        return not self.stopped.wait(delay)
+    
+    def stop(self):
+        self.stopped.set()
 
 class SimpleInstagramPoster:
     def __init__(self):
         self.client = None
+        self.local = threading.local()
+        self.login_lock = threading.Lock()
+        self.session_generation = 0  # bumped on re-login so thread clients drop the rejected session
+        self.relogged_in = False
         self.validate_credentials()
     
     def validate_credentials(self):
@@ -48,15 +90,27 @@ class SimpleInstagramPoster:
     def login(self):
         """Login to Instagram."""
         self.client = Client()
-        session_file = Path(f"{INSTA_USERNAME}_session.json")
         
         print("🔐 Logging into Instagram...")
         
         try:
             # Try to load existing session
-            if session_file.exists():
+            if SESSION_FILE.exists():
                 print("   📱 Loading existing session...")
-                self.client.load_settings(session_file)
+                self.client.load_settings(SESSION_FILE)
+                
+                # A recent session is trusted as-is; an older one is checked once before being reused
+                if self.client.user_id and time.time() - SESSION_FILE.stat().st_mtime < SESSION_VERIFY_AGE:
+                    print(f"✅ Reusing recent session for: @{INSTA_USERNAME}")
+                    return True
+                try:
+                    self.client.get_timeline_feed()
+                    self.client.dump_settings(SESSION_FILE)  # refreshes the file's age
+                    print(f"✅ Reusing session for: @{INSTA_USERNAME}")
+                    return True
+                except LoginRequired:
+                    print("   ⚠️ Saved session expired, logging in again...")
+                    self.reset_session()
             
             # Login
             self.client.login(INSTA_USERNAME, INSTA_PASSWORD)
@@ -65,7 +119,7 @@ class SimpleInstagramPoster:
                 raise LoginRequired("Login verification failed")
             
             # Save session
-            self.client.dump_settings(session_file)
+            self.client.dump_settings(SESSION_FILE)
             
             print(f"✅ Successfully logged in as: @{self.client.username}")
             return True
@@ -82,49 +136,178 @@ class SimpleInstagramPoster:
             print(f"❌ Login error: {e}")
             return False
     
+    def reset_session(self):
+        """Drop a session Instagram rejected, keeping the device uuids so the next login comes from the same 'phone'."""
+        uuids = self.client.get_settings().get("uuids")
+        self.client.set_settings({})
+        if uuids:
+            self.client.set_uuids(uuids)
+    
+    def relogin(self, stale_generation: int) -> bool:
+        """Replace a session rejected mid-run with a fresh password login, once per run and across all threads."""
+        with self.login_lock:
+            if self.session_generation != stale_generation:
+                return True  # another upload thread already logged in again
+            if self.relogged_in:
+                return False
+            self.relogged_in = True
+            print("   ⚠️ Instagram rejected the saved session, logging in again...")
+            self.reset_session()
+            try:
+                self.client.login(INSTA_USERNAME, INSTA_PASSWORD)
+            except Exception as e:
+                print(f"❌ Re-login failed: {e}")
+                return False
+            if not self.client.user_id:
+                print("❌ Re-login failed: login verification failed")
+                return False
+            self.client.dump_settings(SESSION_FILE)
+            self.session_generation += 1
+            return True
+    
+    def thread_client(self) -> Client:
+        """Per-thread Client sharing the logged-in session (a Client keeps per-request state and isn't thread-safe)."""
+        client = getattr(self.local, "client", None)
+        if client is None or self.local.generation != self.session_generation:
+            client = Client()
+            with self.login_lock:
+                client.set_settings(self.client.get_settings())
+                self.local.generation = self.session_generation
+            self.local.client = client
+        return client
+    
     def post_video(self, video_path: Path, caption: str = "") -> bool:
         """Post video to Instagram."""
         if not self.client:
             print("❌ Not logged in to Instagram")
             return False
         
-        try:
-            print(f"📤 Uploading: {video_path.name}")
-            
-            # Upload as reel
-            self.client.clip_upload(
-                path=str(video_path),
-                caption=caption
-            )
-            
-            print("✅ Upload successful!")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Upload failed: {e}")
-            return False
+        print(f"📤 Uploading: {video_path.name}")
+        # A recent session is trusted without a check, so a revoked one only shows up here: log in again and retry once
+        for attempt in range(2):
+            generation = self.session_generation
+            try:
+                # Upload as reel
+                self.thread_client().clip_upload(
+                    path=str(video_path),
+                    caption=caption
+                )
+                
+                print("✅ Upload successful!")
+                return True
+                
+            except LoginRequired as e:
+                if attempt or not self.relogin(generation):
+                    print(f"❌ Upload failed: {e}")
+                    return False
+                
+            except Exception as e:
+                print(f"❌ Upload failed: {e}")
+                return False
+
+# In-memory set of successfully posted fingerprints (filenames for older records), loaded from the log on first use
+_posted_keys = None
+# filename -> mtime_ns of successfully posted files, so an untouched file is skipped without fingerprinting it
+_posted_stamps = {}
+
+def migrate_legacy_posted_log():
+    """Convert the old posted_videos_simple.json array into the JSONL log."""
+    if POSTED_LOG_FILE.exists() or not LEGACY_POSTED_LOG_FILE.exists():
+        return
+    try:
+        records = http_utils.loads(LEGACY_POSTED_LOG_FILE.read_bytes())
+    except json.JSONDecodeError:
+        return
+    with open(POSTED_LOG_FILE, 'wb') as f:
+        f.writelines(http_utils.dumps_line(record) for record in records)
+    print(f"📦 Migrated {len(records)} records from {LEGACY_POSTED_LOG_FILE} to {POSTED_LOG_FILE}")
 
 def get_posted_videos():
-    """Load list of posted videos."""
+    """Yield posted-log records one line at a time."""
+    migrate_legacy_posted_log()
     if not POSTED_LOG_FILE.exists():
-        return []
+        return
+    with open(POSTED_LOG_FILE, 'rb') as f:
+        for line in f:
+            try:
+                yield http_utils.loads(line)
+            except json.JSONDecodeError:
+                # A torn last line from an interrupted write; everything before it is intact
+                continue
+
+@lru_cache(maxsize=None)
+def fingerprint(video_path: Path) -> str:
+    """Content fingerprint of a video, computed once per run."""
+    size = video_path.stat().st_size
+    # Hash the head and tail plus the size: cheap, and enough to spot a re-exported copy under a new name
+    digest = hashlib.sha1(str(size).encode())
+    with open(video_path, 'rb') as f:
+        digest.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+        if size > FINGERPRINT_SAMPLE_BYTES:
+            f.seek(max(FINGERPRINT_SAMPLE_BYTES, size - FINGERPRINT_SAMPLE_BYTES))
+            digest.update(f.read())
+    return f"sha1:{digest.hexdigest()}"
+
+def posted_key(record: dict):
+    """Dedup key of a posted-log record: its content fingerprint, or the filename for records from before fingerprints."""
+    return record.get('fingerprint') or record.get('filename')
+
+def get_posted_keys():
+    """Return the set of successfully posted keys (see posted_key), streaming the log only once per run."""
+    global _posted_keys
+    if _posted_keys is None:
+        posted = set()
+        for item in get_posted_videos():
+            if item.get('success'):
+                posted.add(posted_key(item))
+                if item.get('mtime_ns'):
+                    _posted_stamps[item['filename']] = item['mtime_ns']
+        _posted_keys = posted
+    return _posted_keys
+
+def is_unchanged_since_posted(entry: os.DirEntry) -> bool:
+    """True if a file with this name and modification time was already posted successfully.
+
+    Only a name + mtime match is trusted: a video moved or copied into the folder later keeps its old
+    timestamps (on Windows even its creation time), so a time watermark alone would skip it forever.
+    Anything that doesn't match falls through to the fingerprint check. A different video written under
+    a posted name with the very same mtime (e.g. copied with preserved timestamps) would still be skipped.
+    """
+    get_posted_keys()
+    return _posted_stamps.get(entry.name) == entry.stat().st_mtime_ns
+
+def is_posted(video_path: Path) -> bool:
+    """True if this video's content (or, for older log records, its filename) was already posted."""
+    posted = get_posted_keys()
+    if video_path.name in posted:
+        return True
     try:
-        with open(POSTED_LOG_FILE, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
-        return []
+        return fingerprint(video_path) in posted
+    except OSError:
+        return False
 
 def add_to_posted_log(video_path: Path, success: bool):
     """Add video to posted log."""
-    posted_list = get_posted_videos()
-    posted_list.append({
+    try:
+        mtime_ns = video_path.stat().st_mtime_ns
+        content_fingerprint = fingerprint(video_path)
+    except OSError:
+        mtime_ns = content_fingerprint = None
+    record = {
         "filename": video_path.name,
         "path": str(video_path),
+        "fingerprint": content_fingerprint,
+        "mtime_ns": mtime_ns,
         "posted_at": datetime.now().isoformat(),
         "success": success
-    })
-    with open(POSTED_LOG_FILE, 'w') as f:
-        json.dump(posted_list, f, indent=4)
+    }
+    posted = get_posted_keys()
+    with open(POSTED_LOG_FILE, 'ab') as f:
+        f.write(http_utils.dumps_line(record))
+    if success:
+        posted.add(posted_key(record))
+        if mtime_ns:
+            _posted_stamps[video_path.name] = mtime_ns
 
 def find_latest_upscaled_videos():
     """Find the latest upscaled videos."""
@@ -135,16 +318,14 @@ def find_latest_upscaled_videos():
     # Find latest Run folder
     print("🔍 Searching for latest Run folder...")
     try:
-        run_folders = sorted(
-            [d for d in COMFYUI_OUTPUT_DIR_BASE.iterdir() if d.is_dir() and d.name.startswith("Run_")],
-            key=lambda x: x.stat().st_mtime,
-            reverse=True
-        )
+        # DirEntry caches its type/stat from the directory listing (free on Windows), unlike Path.stat()
+        with os.scandir(COMFYUI_OUTPUT_DIR_BASE) as it:
+            run_folders = [e for e in it if e.name.startswith("Run_") and e.is_dir()]
         if not run_folders:
             print("❌ No Run folders found")
             return []
         
-        latest_run = run_folders[0]
+        latest_run = Path(max(run_folders, key=lambda e: e.stat().st_mtime).path)
         print(f"📁 Using latest run: {latest_run.name}")
         
     except Exception as e:
@@ -158,18 +339,53 @@ def find_latest_upscaled_videos():
         return []
     
     print(f"📂 Scanning: {upscaled_dir}")
-    all_videos = sorted(upscaled_dir.glob("*_upscaled.mp4"), key=lambda p: p.stat().st_ctime)
-    print(f"📹 Found {len(all_videos)} upscaled videos total")
-    
-    # Filter out already posted successful uploads
-    posted_videos = get_posted_videos()
-    successfully_posted = [item.get('filename') for item in posted_videos if item.get('success')]
+    with os.scandir(upscaled_dir) as it:
+        entries = [e for e in it if e.name.endswith("_upscaled.mp4") and e.is_file()]
+    print(f"📹 Found {len(entries)} upscaled videos total")
     
-    unposted = [v for v in all_videos if v.name not in successfully_posted]
+    # Filter out already posted successful uploads: files untouched since they were posted are settled,
+    # so only the rest need fingerprinting and the sort
+    candidates = [e for e in entries if not is_unchanged_since_posted(e)]
+    candidates.sort(key=lambda e: e.stat().st_ctime_ns)
+    candidate_paths = [Path(e.path) for e in candidates]
+    if len(candidate_paths) > 1:
+        # Each fingerprint is two small independent reads; issue them side by side
+        with ThreadPoolExecutor(max_workers=min(FINGERPRINT_WORKERS, len(candidate_paths))) as executor:
+            posted_flags = list(executor.map(is_posted, candidate_paths))
+    else:
+        posted_flags = [is_posted(video) for video in candidate_paths]
+    unposted = [video for video, posted in zip(candidate_paths, posted_flags) if not posted]
     print(f"📤 Found {len(unposted)} unposted videos")
     
     return unposted
 
+def prefetch(video_path: Path):
+    """Pull a video into the OS page cache so its upload starts from memory instead of a cold disk."""
+    try:
+        with open(video_path, 'rb') as f:
+            if hasattr(os, 'posix_fadvise'):
+                # The kernel reads it ahead in the background
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+            else:
+                while f.read(PREFETCH_CHUNK_BYTES):
+                    pass
+    except OSError:
+        pass  # Only an optimisation; the upload reads the file itself
+
+def upload_one(poster: SimpleInstagramPoster, pacer: UploadPacer, index: int, total: int, video_path: Path):
+    """Wait for an upload slot, then post one video; returns (video_path, success or None if stopped)."""
+    delay = pacer.reserve()
+    if delay > 0:
+        # Use the wait to warm the cache for this video
+        threading.Thread(target=prefetch, args=(video_path,), daemon=True).start()
+    if not pacer.wait(delay):
+        return video_path, None
+    
+    print(f"\n{'='*60}")
+    print(f"🎬 Video {index+1}/{total}: {video_path.name}")
+    print(f"{'='*60}")
+    return video_path, poster.post_video(video_path)
+
 def main():
     print("=" * 60)
     print("📱 SIMPLE INSTAGRAM VIDEO POSTER")
@@ -204,32 +420,48 @@ def main():
         print("\n❌ Upload cancelled")
         sys.exit(0)
     
-    # Process each video
+    # Process videos: uploads start DELAY_BETWEEN_UPLOADS_SECONDS apart and may overlap;
+    # results are logged in submission order
     successful = 0
     failed = 0
     
-    for i, video_path in enumerate(videos_to_post):
-        print(f"\n{'='*60}")
-        print(f"🎬 Video {i+1}/{len(videos_to_post)}: {video_path.name}")
-        print(f"{'='*60}")
-        
-        # Upload video
-        success = poster.post_video(video_path)
-        
-        # Log result
-        add_to_posted_log(video_path, success)
-        
-        if success:
-            successful += 1
-            print("✅ Upload completed successfully!")
-        else:
-            failed += 1
-            print("❌ Upload failed!")
-        
-        # Wait before next upload (except for last video)
-        if i < len(videos_to_post) - 1:
-            print(f"⏳ Waiting {DELAY_BETWEEN_UPLOADS_SECONDS} seconds before next upload...")
-            time.sleep(DELAY_BETWEEN_UPLOADS_SECONDS)
+    pacer = UploadPacer(DELAY_BETWEEN_UPLOADS_SECONDS)
+    executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_UPLOADS)
+    futures = [
+        executor.submit(upload_one, poster, pacer, i, len(videos_to_post), video_path)
+        for i, video_path in enumerate(videos_to_post)
+    ]
+    pending = list(futures)
+    try:
+        while pending:
+            video_path, success = pending[0].result()
+            pending.pop(0)
+            if success is None:
+                continue
+            
+            # Log result
+            add_to_posted_log(video_path, success)
+            
+            if success:
+                successful += 1
+                print(f"✅ Upload completed successfully: {video_path.name}")
+            else:
+                failed += 1
+                print(f"❌ Upload failed: {video_path.name}")
+    except KeyboardInterrupt:
+        print("\n❌ Upload cancelled (uploads already in progress will finish)")
+        pacer.stop()
+        executor.shutdown(wait=True, cancel_futures=True)
+        # Still record uploads that went through, so they aren't posted again next run
+        for future in pending:
+            if not future.cancelled():
+                video_path, success = future.result()
+                if success is not None:
+                    add_to_posted_log(video_path, success)
+                    successful += success
+                    failed += not success
+    finally:
+        executor.shutdown(wait=False)
     
     # Final summary
     print(f"\n{'='*60}")